@@ -0,0 +1,56 @@
+import os
+import locale
+import platform
+import subprocess
+from typing import *
+
+# Общее для бенчмарков. Запускаются из корня репозитория: настройки бота читаются из configs,
+# как при обычном запуске (нужен configs/token.txt, сам токен не используется)
+
+# Корень репозитория
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Русские локали, которые бот устанавливает при импорте core.replacements
+RUSSIAN_LOCALES = ("ru_RU.UTF-8", "Russian_Russia.1251")
+
+
+def allow_missing_russian_locale():
+    """
+    Бот без русской локали не запускается: названия дней не совпадут с сайтом. Бенчмаркам она не нужна -
+    страницы набора строятся с теми же названиями дней, что выдаёт текущая локаль. Если русской локали
+    нет, запросы её установки заменяются на локаль "C". Вызывается до импорта компонентов проекта.
+    """
+    for name in RUSSIAN_LOCALES:
+        try:
+            locale.setlocale(locale.LC_TIME, name)
+            return
+        except locale.Error:
+            pass
+    setlocale = locale.setlocale
+
+    def setlocale_or_c(category: int, name: Optional[str] = None) -> str:
+        if name in RUSSIAN_LOCALES:
+            name = "C"
+        return setlocale(category, name)
+
+    locale.setlocale = setlocale_or_c
+
+
+def git_commit() -> Optional[str]:
+    """Хэш текущего коммита или None вне репозитория git"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Optional[str]]:
+    """Окружение запуска для отчёта: коммит, версия Python и платформа"""
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+allow_missing_russian_locale()
@@ -0,0 +1,94 @@
+import os
+import glob
+import random
+from typing import *
+# Компоненты бенчмарка
+from benchmarks.common import ROOT
+
+# Набор страниц замен разного размера. Страницы повторяют разметку сайта колледжа и строятся
+# детерминированно (фиксированное зерно), поэтому результаты разных запусков сравнимы.
+
+GROUPS = [f"{prefix}-{course}{number}" for prefix in ("ТО", "ЭС", "ПО", "ЮР", "МС", "РТ", "АС", "ЭК")
+          for course in range(1, 5) for number in range(1, 4)]
+SUBJECTS = ["Математика", "Физика", "Химия", "История", "Белорусский язык", "Русский язык", "Английский язык",
+            "Информатика", "Электротехника", "Черчение", "Экономика", "Основы права", "Физкультура",
+            "Программирование", "Базы данных", "Сети", "Охрана труда"]
+TEACHERS = ["Иванов И.И.", "Петров П.П.", "Сидоров С.С.", "Ковалёв А.В.", "Новик Е.Н.", "Мельник О.Л.",
+            "Шевчук Д.А.", "Бондарь Т.М.", "Кравченко Ю.С.", "Ткачук В.И.", "Лысенко Н.Г.", "Ёлкин Р.Р."]
+TIMES = ["13:35-14:20", "14:30-15:15", "15:25-16:10"]
+
+HEADER_ROW = ("<tr><td>Группа</td><td>Пара</td><td>Было</td><td>Стало</td>"
+              "<td>Преподаватель</td><td>Ауд</td></tr>")
+
+# Сохранённые страницы сайта (общие с эталонными тестами разборщиков); index.html - страница со ссылками
+SAVED_PAGES_DIR = os.path.join(ROOT, "tests", "fixtures", "replacements")
+
+# Имя страницы -> (число таблиц, строк замен в каждой таблице)
+SIZES = {
+    "small": (1, 15),
+    "typical": (2, 80),
+    "large": (4, 600),
+}
+
+
+def _cells(rng: random.Random) -> Tuple[str, str, str, str, str, str]:
+    """Строка замены одного из видов, как их публикует сайт"""
+    group = rng.choice(GROUPS)
+    pair = str(rng.randint(1, 6)) if rng.random() > 0.05 else rng.choice(TIMES)
+    kind = rng.random()
+    if kind < 0.2:  # Пара снята
+        return group, pair, rng.choice(SUBJECTS), "-", "-", "-"
+    if kind < 0.35:  # Пара добавлена
+        return group, pair, "-", rng.choice(SUBJECTS), rng.choice(TEACHERS), str(rng.randint(100, 420))
+    if kind < 0.5:  # Перенос в другой кабинет
+        return group, pair, str(rng.randint(100, 420)), "→", str(rng.randint(100, 420)), ""
+    teacher = rng.choice(TEACHERS)
+    if rng.random() < 0.1:  # Несколько преподавателей
+        teacher += " / " + rng.choice(TEACHERS)
+    return group, pair, rng.choice(SUBJECTS), rng.choice(SUBJECTS), teacher, str(rng.randint(100, 420))
+
+
+def make_day_page(day: str, date: str, tables: int, rows: int, seed: int = 0) -> str:
+    """Страница замен на день: tables таблиц по rows строк замен"""
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(tables):
+        lines = [HEADER_ROW]
+        for _ in range(rows):
+            lines.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in _cells(rng)) + "</tr>")
+        # На сайте встречаются пустые строки
+        lines.append("<tr>" + "<td></td>" * 6 + "</tr>")
+        parts.append('<table border="1">\n' + "\n".join(lines) + "\n</table>")
+    return (f'<html><head><meta charset="utf-8"><title>Замена занятий</title></head><body>'
+            f'<div id="header"><table><tr><td>Меню</td></tr></table></div>'
+            f'<div id="MCZ_Content">\n<h1>Замены на <span>{date}</span></h1><h2>{day.lower()}</h2>\n'
+            + "\n".join(parts) +
+            '\n</div><div id="footer">Брестский политехнический колледж</div></body></html>')
+
+
+def make_index_page(links: Dict[str, str]) -> str:
+    """Страница со ссылками на замены по дням"""
+    rows = "".join(f'<tr><td><a href="{href}">{day}</a></td></tr>' for day, href in links.items())
+    return f'<html><body><div id="MCZ_Content"><table class="category">{rows}</table></div></body></html>'
+
+
+def load_saved_pages() -> Dict[str, str]:
+    """Сохранённые страницы замен: saved_<имя файла> -> HTML"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(SAVED_PAGES_DIR, "*.html"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name == "index":
+            continue
+        with open(path, encoding="utf-8") as file:
+            pages[f"saved_{name}"] = file.read()
+    return pages
+
+
+def build_corpus() -> Dict[str, str]:
+    """Страницы набора: имя -> HTML. Сгенерированные страницы дополняются сохранёнными страницами сайта"""
+    days = ["Понедельник", "Вторник", "Среда"]
+    corpus = {}
+    for seed, (name, (tables, rows)) in enumerate(SIZES.items()):
+        corpus[name] = make_day_page(days[seed % len(days)], f"{20 + seed}.10.2026", tables, rows, seed)
+    corpus.update(load_saved_pages())
+    return corpus
@@ -0,0 +1,270 @@
+"""
+Нагрузочный тест бота без Telegram: синтетические обновления подаются прямо в диспетчер,
+а запросы бота к API обрабатывает заглушка сессии.
+
+Каждый виртуальный пользователь проходит регистрацию (студент или преподаватель, иногда с отменой),
+отправляет серию команд (/bells, /week, /today, ...) и удаляет аккаунт через /unregister.
+Базы данных пользователей и FSM создаются во временной директории. Перед запуском replacements_manager
+заполняется заменами из сгенерированных страниц на сегодня и завтра, чтобы /today, /tomorrow и /changes
+строили настоящие ответы, а не "замен нет" (--empty-replacements - замер с пустыми заменами).
+
+Запуск из корня репозитория (настройки читаются из configs, как при запуске бота):
+    python -m benchmarks.load_test --users 1000 --output load.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+import itertools
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import *
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.client.session.base import BaseSession
+# Общее для бенчмарков, до компонентов проекта (локаль)
+from benchmarks.common import environment
+# Компоненты проекта
+import main
+import database.database as database
+from database.fsm_storage import create_fsm_storage
+from core.replacements import replacements_manager, ReplacementSchedule, Replacements
+# Компоненты бенчмарка
+from benchmarks.corpus import GROUPS, TEACHERS, SIZES, make_day_page
+
+# Команды, которыми пользователи засыпают бота после регистрации
+SPAM_COMMANDS = ["/start", "/help", "/bells", "/bells 2", "/now", "/week", "/nextweek", "/currweek",
+                 "/today", "/tomorrow", "/changes"]
+# Доли сценариев регистрации
+TEACHER_SHARE = 0.2
+CANCEL_SHARE = 0.1
+
+
+class FakeSession(BaseSession):
+    """Сессия бота без сети: отвечает на методы API заглушками через latency секунд"""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter = Counter()
+
+    async def make_request(self, bot: Bot, method, timeout: int = None):
+        self.calls[method.__api_method__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if method.__api_method__ in ("sendMessage", "editMessageText"):
+            chat_id = getattr(method, "chat_id", None) or 0
+            return types.Message.model_validate({
+                "message_id": 1, "date": int(time.time()), "chat": {"id": chat_id, "type": "private"},
+                "text": method.text,
+            })
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+class LoadTest:
+    """Виртуальные пользователи и статистика обработки их обновлений"""
+
+    def __init__(self, dp: Dispatcher, bot: Bot, groups: List[Tuple[int, str, str]]):
+        self.dp = dp
+        self.bot = bot
+        self.groups = groups
+        self._update_ids = itertools.count(1)
+        # Вид обновления -> длительности обработки
+        self.latencies: DefaultDict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    @staticmethod
+    def _user(user_id: int) -> Dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": "User"}
+
+    def _message(self, user_id: int, text: str) -> types.Update:
+        update_id = next(self._update_ids)
+        message = {
+            "message_id": update_id, "date": int(time.time()), "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id), "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return types.Update.model_validate({"update_id": update_id, "message": message})
+
+    def _callback(self, user_id: int, data: str) -> types.Update:
+        update_id = next(self._update_ids)
+        return types.Update.model_validate({"update_id": update_id, "callback_query": {
+            "id": str(update_id), "from": self._user(user_id), "chat_instance": str(user_id), "data": data,
+            # Ненулевая дата: иначе aiogram считает сообщение недоступным
+            "message": {"message_id": update_id, "date": int(time.time()),
+                        "chat": {"id": user_id, "type": "private"}, "text": "..."},
+        }})
+
+    async def _feed(self, kind: str, update: types.Update):
+        start = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception as err:
+            self.errors[f"{type(err).__name__}: {err}"] += 1
+        self.latencies[kind].append(time.perf_counter() - start)
+
+    async def send(self, user_id: int, text: str):
+        kind = text.split()[0] if text.startswith("/") else "text"
+        await self._feed(kind, self._message(user_id, text))
+
+    async def press(self, user_id: int, data: str):
+        await self._feed("callback:" + data.split(":", 1)[0], self._callback(user_id, data))
+
+    async def register(self, user_id: int, rng: random.Random):
+        """Проход FSM регистрации, как его выполняет пользователь"""
+        await self.send(user_id, "/register")
+        if rng.random() < CANCEL_SHARE:
+            await self.send(user_id, "/cancel")
+            await self.send(user_id, "/register")
+        last_name = rng.choice(TEACHERS).split()[0]
+        if rng.random() < TEACHER_SHARE:
+            await self.press(user_id, "reg:teacher")
+            await self.send(user_id, "Иван")
+            await self.send(user_id, last_name)
+            return
+        gid, _, name = rng.choice(self.groups)
+        await self.press(user_id, "reg:student")
+        await self.press(user_id, f"grp_id:{gid}|grp_name:{name}")
+        await self.press(user_id, f"sub:{rng.randint(1, 2)}")
+        await self.press(user_id, "skip:fname")
+        if rng.random() < 0.5:
+            await self.press(user_id, "skip:lname")
+        else:
+            await self.send(user_id, last_name)
+
+    async def run_user(self, user_id: int, rounds: int, commands: int, seed: int):
+        rng = random.Random(seed)
+        for _ in range(rounds):
+            await self.register(user_id, rng)
+            for _ in range(commands):
+                await self.send(user_id, rng.choice(SPAM_COMMANDS))
+            await self.send(user_id, "/unregister")
+
+
+def preload_replacements(days: int = 2, seed: int = 0) -> List[str]:
+    """
+    Заполняет replacements_manager заменами из сгенерированных страниц (размер typical) на сегодня
+    и следующие days - 1 дней. Возвращает даты замен.
+    """
+    schedule = ReplacementSchedule("", "")
+    replacements = {}
+    for offset in range(days):
+        day = date.today() + timedelta(days=offset)
+        page = make_day_page(day.strftime('%A'), day.strftime('%d.%m.%Y'), *SIZES["typical"], seed + offset)
+        replacements[day.strftime('%A').capitalize()] = Replacements(schedule._parse_replacements(page))
+    replacements_manager.replacements = replacements
+    replacements_manager.loaded = True
+    replacements_manager.version += 1
+    return [replacements.date.date().isoformat() for replacements in replacements.values()]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Количество и перцентили длительностей в миллисекундах"""
+    ordered = sorted(values)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def database_report() -> Dict[str, Any]:
+    """Время функций базы данных, включая ожидание очереди записи"""
+    functions = {}
+    for (function,), (count, total) in database.DB_QUERY_SECONDS.totals().items():
+        functions[function] = {"count": count, "total_s": total, "mean_ms": total / count * 1000}
+    return {"functions": functions}
+
+
+async def run(users: int, rounds: int, commands: int, storage: str, api_latency: float,
+              seed: int, empty_replacements: bool = False) -> Dict[str, Any]:
+    replacement_dates = [] if empty_replacements else preload_replacements(seed=seed)
+    with tempfile.TemporaryDirectory() as directory:
+        await database.init_users_db(os.path.join(directory, "users.sqlite"))
+        for name in GROUPS:
+            await database.add_group(name, 1)
+        groups = await database.get_groups()
+
+        dp = main.create_dispatcher(create_fsm_storage({"backend": storage,
+                                                        "path": os.path.join(directory, "fsm.sqlite")}))
+        session = FakeSession(api_latency)
+        bot = Bot(main.bot.token, session=session, default=main.bot.default)
+        test = LoadTest(dp, bot, groups)
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(*(test.run_user(1_000_000 + number, rounds, commands, seed + number)
+                                   for number in range(users)))
+            duration = time.perf_counter() - start
+        finally:
+            await dp.storage.close()
+            await database.close_users_db()
+
+    all_latencies = [value for values in test.latencies.values() for value in values]
+    return {
+        **environment(),
+        "parameters": {"users": users, "rounds": rounds, "commands": commands, "storage": storage,
+                       "api_latency": api_latency, "seed": seed},
+        # Пустой список: /today, /tomorrow и /changes отвечали "замен нет", их задержки не показательны
+        "replacement_dates": replacement_dates,
+        "duration_s": duration,
+        "updates": len(all_latencies),
+        "updates_per_second": len(all_latencies) / duration,
+        "latency": summarize(all_latencies),
+        "latency_by_kind": {kind: summarize(values) for kind, values in sorted(test.latencies.items())},
+        "errors": dict(test.errors),
+        "api_calls": dict(session.calls),
+        "database": database_report(),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Load test of the bot with synthetic updates")
+    parser.add_argument("--users", type=int, default=500, help="number of concurrent virtual users")
+    parser.add_argument("--rounds", type=int, default=1, help="register/unregister cycles per user")
+    parser.add_argument("--commands", type=int, default=10, help="commands sent by a user after registration")
+    parser.add_argument("--storage", choices=["sqlite", "memory", "redis"], default="sqlite",
+                        help="FSM storage (redis uses the default local URL)")
+    parser.add_argument("--api-latency", type=float, default=0.0,
+                        help="simulated Telegram API response time in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--empty-replacements", action="store_true",
+                        help="do not preload replacements (commands take the \"no replacements\" path)")
+    parser.add_argument("--output", help="file for JSON results (default: stdout)")
+    args = parser.parse_args()
+
+    # Журнал каждого обработанного обновления исказит измерения
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+
+    report = asyncio.run(run(args.users, args.rounds, args.commands, args.storage, args.api_latency, args.seed,
+                             args.empty_replacements))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    if report["errors"]:
+        print("Some updates failed, see \"errors\"", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,156 @@
+"""
+Бенчмарк цепочки загрузка -> разбор -> построение -> вывод замен без доступа к сети.
+Страницы набора (benchmarks/corpus.py) отдаёт локальная заглушка сайта.
+
+Запуск из корня репозитория (настройки читаются из configs, как при запуске бота):
+    python -m benchmarks.run --output bench.json
+Результат - JSON со статистикой времени каждого замера (в секундах), пригодный для сравнения коммитов.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from typing import *
+
+# Общее для бенчмарков, до компонентов проекта (локаль)
+from benchmarks.common import environment
+# Компоненты проекта
+from configs.config_reader import config
+from core.bells import BellSchedule
+from core.my_utils import escape_for_telegram
+from core.html_backends import BACKENDS, available_backends, get_backend
+from core.replacements import ReplacementSchedule, Replacements
+# Компоненты бенчмарка
+from benchmarks.corpus import build_corpus, TEACHERS
+from benchmarks.stub_site import start_stub, INDEX_PATH
+
+
+def measure(func: Callable[[], Any], repeat: int, number: int = 1) -> Dict[str, float]:
+    """Запускает func number раз подряд repeat раз и возвращает статистику времени одного вызова"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "max": max(times),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+async def measure_async(func: Callable[[], Awaitable[Any]], repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "max": max(times),
+        "repeat": repeat,
+        "number": 1,
+    }
+
+
+def parse_final(backend: str, page: str) -> Optional[Dict[str, Any]]:
+    """Итоговый результат разбора страницы: замены в формате хранилища (Replacements.to_raw)"""
+    raw = ReplacementSchedule("", "", backend=get_backend(backend))._parse_replacements(page)
+    return Replacements(raw).to_raw() if raw is not None else None
+
+
+def check_backends(corpus: Dict[str, str], backends: List[str]) -> Dict[str, bool]:
+    """Проверяет, что все разборщики дают одинаковые итоговые замены для каждой страницы набора"""
+    result = {}
+    for name, page in corpus.items():
+        parsed = [parse_final(backend, page) for backend in backends]
+        result[name] = all(item == parsed[0] for item in parsed[1:])
+    return result
+
+
+async def run(repeat: int, backends: List[str]) -> Dict[str, Any]:
+    corpus = build_corpus()
+    results: Dict[str, Dict[str, float]] = {}
+
+    # Загрузка и разбор через заглушку сайта: get_replacements_raw делает настоящий HTTP-запрос
+    runner, base_url = await start_stub(corpus)
+    try:
+        for backend in backends:
+            schedule = ReplacementSchedule(base_url, INDEX_PATH, backend=get_backend(backend))
+            try:
+                await schedule.fetch_replacements_links()
+                for name in corpus:
+                    results[f"get_replacements_raw[{backend}][{name}]"] = await measure_async(
+                        lambda: schedule.get_replacements_raw(name), repeat
+                    )
+            finally:
+                await schedule.close()
+    finally:
+        await runner.cleanup()
+
+    # Этапы по отдельности, без сети и пула потоков
+    bells = BellSchedule(config.bells)
+    for name, page in corpus.items():
+        for backend in backends:
+            schedule = ReplacementSchedule("", "", backend=get_backend(backend))
+            results[f"parse[{backend}][{name}]"] = measure(lambda: schedule._parse_replacements(page), repeat)
+
+        raw = ReplacementSchedule("", "", backend=get_backend(backends[0]))._parse_replacements(page)
+        if raw is None:
+            # Страница без блока замен: измеряется только разбор
+            continue
+        results[f"replacements_build[{name}]"] = measure(lambda: Replacements(raw), repeat)
+
+        replacements = Replacements(raw)
+        last_names = [teacher.split()[0] for teacher in TEACHERS]
+        results[f"teacher_query[{name}]"] = measure(
+            lambda: [replacements.get_teacher_replacements(last_name) for last_name in last_names], repeat
+        )
+
+        texts = [replacements.format_group(group) for group in replacements.get_groups()]
+        results[f"escape_for_telegram[{name}]"] = measure(lambda: [escape_for_telegram(text) for text in texts],
+                                                          repeat)
+
+    results["format_day_bells"] = measure(
+        lambda: [bells.format_day_bells(day) for day in config.bells], repeat, number=100
+    )
+
+    return {
+        **environment(),
+        "backends": backends,
+        "backends_equivalent": check_backends(corpus, backends),
+        "pages": {name: len(page) for name, page in corpus.items()},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the replacements pipeline")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per measurement")
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS),
+                        help="HTML parser to measure (may be repeated, default: all installed)")
+    parser.add_argument("--output", help="file for JSON results (default: stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.repeat, args.backend or available_backends()))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    if not all(report["backends_equivalent"].values()):
+        print("HTML parsers disagree on some pages!", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
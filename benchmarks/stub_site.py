@@ -0,0 +1,37 @@
+from aiohttp import web
+from typing import *
+# Компоненты бенчмарка
+from benchmarks.corpus import make_index_page
+
+INDEX_PATH = "/index"
+
+
+def create_stub_app(pages: Dict[str, str]) -> web.Application:
+    """
+    Заглушка сайта колледжа: INDEX_PATH - страница со ссылками (текст ссылки - имя страницы
+    с заглавной буквы, как названия дней на сайте), /day/<имя> - страница из pages.
+    """
+    index = make_index_page({name.capitalize(): f"/day/{name}" for name in pages})
+
+    async def handle_index(request: web.Request) -> web.Response:
+        return web.Response(text=index, content_type="text/html")
+
+    async def handle_day(request: web.Request) -> web.Response:
+        page = pages.get(request.match_info["name"])
+        if page is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=page, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get(INDEX_PATH, handle_index)
+    app.router.add_get("/day/{name}", handle_day)
+    return app
+
+
+async def start_stub(pages: Dict[str, str], host: str = "127.0.0.1", port: int = 0) -> Tuple[web.AppRunner, str]:
+    """Запускает заглушку и возвращает (runner, базовый адрес). Порт 0 - любой свободный"""
+    runner = web.AppRunner(create_stub_app(pages), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner, f"http://{host}:{runner.addresses[0][1]}"
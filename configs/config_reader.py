@@ -9,6 +9,11 @@ class Settings(BaseSettings):
     bells: Dict
     changes: Dict
     users: Dict
+    notifications: Dict = {}
+    calendar: Dict = {}
+    bot: Dict = {}
+    fsm: Dict = {}
+    metrics: Dict = {}
 
 
 try:
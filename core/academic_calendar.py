@@ -0,0 +1,106 @@
+from enum import Enum
+from datetime import date, timedelta
+from typing import *
+# Настройки
+from configs.config_reader import config
+# Компоненты проекта
+from core.week import Week
+
+
+class DayType(str, Enum):
+    """Тип учебного дня"""
+    WORKING = "working"  # Рабочий день
+    SATURDAY = "saturday"  # Суббота (расписание выходного дня)
+    SHORTENED = "shortened"  # Сокращённый день
+    HOLIDAY = "holiday"  # Пар нет
+
+
+# Расписание звонков (ключ блока bells) для каждого типа дня
+BELLS_DAYS = {
+    DayType.WORKING: "working_day",
+    DayType.SATURDAY: "weekend_day",
+    DayType.SHORTENED: "shortened_day",
+    DayType.HOLIDAY: None,
+}
+
+
+class DayInfo(NamedTuple):
+    """Сведения о дне учебного года"""
+    day: date
+    week_number: int  # Номер недели начиная с первой недели учебного года
+    is_upper: bool
+    day_type: DayType
+
+    @property
+    def week_type(self) -> str:
+        """Возвращает 'верхняя' или 'нижняя'"""
+        return "верхняя" if self.is_upper else "нижняя"
+
+    @property
+    def bells_day(self) -> Optional[str]:
+        """Расписание звонков для дня или None, если пар нет"""
+        return BELLS_DAYS[self.day_type]
+
+
+class AcademicCalendar:
+    """
+    Календарь учебного года.
+    Таблица дата -> DayInfo строится один раз на весь учебный год (с 1 сентября по 31 августа),
+    поэтому номер недели и тип дня определяются поиском в словаре.
+    """
+
+    def __init__(self, overrides: Dict[date, DayType] = None):
+        self.overrides = overrides or {}  # Дни, тип которых отличается от обычного (праздники, переносы)
+        self._years: Dict[int, Dict[date, DayInfo]] = {}  # Год начала учебного года -> таблица дней
+
+    @classmethod
+    def from_config(cls, calendar_config: Dict) -> "AcademicCalendar":
+        """Создаёт календарь из блока calendar файла настроек"""
+        overrides = {}
+        for day, day_type in (calendar_config.get("overrides") or {}).items():
+            # YAML сам разбирает даты без кавычек, даты в кавычках остаются строками
+            overrides[day if isinstance(day, date) else date.fromisoformat(str(day))] = DayType(day_type)
+        return cls(overrides)
+
+    @staticmethod
+    def academic_year(day: date) -> int:
+        """Год начала учебного года, к которому относится день"""
+        return day.year if day.month >= 9 else day.year - 1
+
+    def _default_type(self, day: date) -> DayType:
+        weekday = day.weekday()
+        if weekday == 6:
+            return DayType.HOLIDAY
+        if weekday == 5:
+            return DayType.SATURDAY
+        return DayType.WORKING
+
+    def _build_year(self, year: int) -> Dict[date, DayInfo]:
+        start_monday = Week(date(year, 9, 1)).start_monday
+        table = {}
+        day, end = date(year, 9, 1), date(year + 1, 8, 31)
+        while day <= end:
+            week_number = (day - start_monday).days // 7 + 1
+            day_type = self.overrides.get(day) or self._default_type(day)
+            table[day] = DayInfo(day, week_number, week_number % 2 == 1, day_type)
+            day += timedelta(days=1)
+        return table
+
+    def get_day(self, day: date = None) -> DayInfo:
+        """Сведения о дне (по умолчанию - о сегодняшнем)"""
+        day = day or date.today()
+        year = self.academic_year(day)
+        table = self._years.get(year)
+        if table is None:
+            table = self._years[year] = self._build_year(year)
+            # Хранятся только таблицы текущего и соседних учебных лет
+            for old_year in [old_year for old_year in self._years if abs(old_year - year) > 1]:
+                del self._years[old_year]
+        return table[day]
+
+    def get_next_week(self, day: date = None) -> DayInfo:
+        """Сведения о том же дне следующей недели"""
+        return self.get_day((day or date.today()) + timedelta(days=7))
+
+
+academic_calendar = AcademicCalendar.from_config(config.calendar)
@@ -1,11 +1,83 @@
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional, Tuple
+# Настройки
+from configs.config_reader import config
+
+
+def parse_time(value: str) -> int:
+    """Переводит время вида 8:00 в минуты от начала суток"""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_time(minutes: int) -> str:
+    """Переводит минуты от начала суток во время вида 8:00"""
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+class CompiledDay(NamedTuple):
+    """Расписание звонков дня, подготовленное для быстрых запросов"""
+    name: str
+    bounds: List[int]  # Начала и концы уроков по порядку, в минутах: [начало1, конец1, начало2, ...]
+    lessons: List[Tuple[int, int, int]]  # Для каждого урока: (номер пары, номер урока в паре, уроков в паре)
+
+
+class BellStatus(NamedTuple):
+    """Что происходит в заданный момент дня"""
+    state: str  # "before" - пары не начались, "lesson" - урок, "break" - перерыв, "after" - пары закончились
+    pair: Optional[int] = None  # Текущая пара (для "lesson") или следующая (для "before" и "break")
+    lesson: Optional[int] = None  # Номер урока в этой паре
+    lessons_in_pair: Optional[int] = None
+    next_bell: Optional[int] = None  # Время следующего звонка в минутах
+    left: Optional[int] = None  # Минут до следующего звонка
 
 
 class BellSchedule:
     """Класс для упрощения работы со списком звонков"""
 
+    BEFORE = "before"
+    LESSON = "lesson"
+    BREAK = "break"
+    AFTER = "after"
+
     def __init__(self, bells_data: Dict[str, Dict[str, List]]):
         self.bells = bells_data
+        # Расписания переводятся в минуты и форматируются один раз
+        self._compiled: Dict[str, CompiledDay] = {}
+        self._formatted: Dict[str, str] = {}
+        for day_type, day_bells in bells_data.items():
+            self._compiled[day_type] = self._compile(day_bells)
+            self._formatted[day_type] = self._format(day_type, day_bells)
+
+    @staticmethod
+    def _compile(day_bells: Dict) -> CompiledDay:
+        lessons = []
+        for pair_number, pare in enumerate(day_bells["time"], start=1):
+            for lesson_number, lesson in enumerate(pare, start=1):
+                lessons.append((parse_time(lesson[0]), parse_time(lesson[1]), (pair_number, lesson_number, len(pare))))
+        lessons.sort()
+
+        bounds = []
+        for start, end, _ in lessons:
+            bounds += [start, end]
+        return CompiledDay(day_bells["name"], bounds, [info for _, _, info in lessons])
+
+    @staticmethod
+    def _format(day_type: str, day_bells: Dict) -> str:
+        lines = []
+        for i, pare in enumerate(day_bells["time"], start=1):
+            if i == 4:
+                lines.append("")
+            lines.append(f"• Пара {i}:")
+            for lesson in pare:
+                lines.append(lesson[0] + "-" + lesson[1])
+
+        if not lines:
+            formatted_day_type = day_type.replace('_', ' ')
+            return f"Расписание для *{formatted_day_type}* пусто"
+
+        message_header = "*Расписание звонков\n(" + day_bells["name"] + ")*\n\n"
+        return message_header + "\n".join(lines) + "\n"
 
     def get_day_bells(self, day_type: str) -> Optional[Dict]:
         """Получить расписание по дню"""
@@ -13,25 +85,54 @@ class BellSchedule:
 
     def format_day_bells(self, day_type: str) -> str:
         """Получить отформатированное текстом расписание"""
-        day_bells = self.get_day_bells(day_type)
-        if day_bells is None:
+        formatted = self._formatted.get(day_type)
+        if formatted is None:
             formatted_day_type = day_type.replace('_', ' ')
             return f"Расписание для *{formatted_day_type}* не найдено"
+        return formatted
 
-        message_header = "*Расписание звонков\n(" + day_bells["name"] + ")*\n\n"
+    def get_status(self, day_type: str, minute: int) -> Optional[BellStatus]:
+        """
+        Определяет, что происходит в момент minute (минуты от начала суток) по расписанию дня.
+        Возвращает None, если расписание дня не найдено.
+        """
+        day = self._compiled.get(day_type)
+        if day is None:
+            return None
+        if not day.bounds:
+            return BellStatus(self.AFTER)
 
-        i = 1
-        message = ""
-        for pare in day_bells["time"]:
-            if i == 4:
-                message += "\n"
-            message += "• Пара " + i.__str__() + ":\n"
-            i = i + 1
-            for lesson in pare:
-                message += lesson[0] + "-" + lesson[1] + "\n"
+        idx = bisect_right(day.bounds, minute)
+        if idx == len(day.bounds):
+            return BellStatus(self.AFTER)
+
+        next_bell = day.bounds[idx]
+        # Нечётный индекс - внутри урока, чётный - до начала урока idx // 2
+        pair, lesson, lessons_in_pair = day.lessons[idx // 2]
+        if idx == 0:
+            state = self.BEFORE
+        elif idx % 2:
+            state = self.LESSON
+        else:
+            state = self.BREAK
+        return BellStatus(state, pair, lesson, lessons_in_pair, next_bell, next_bell - minute)
 
-        if not message:
+    def format_status(self, day_type: str, minute: int) -> str:
+        """Получить отформатированное текстом состояние на момент minute"""
+        status = self.get_status(day_type, minute)
+        if status is None:
             formatted_day_type = day_type.replace('_', ' ')
-            return f"Расписание для *{formatted_day_type}* пусто"
+            return f"Расписание для *{formatted_day_type}* не найдено"
+        if status.state == self.AFTER:
+            return "Пары на сегодня закончились"
+
+        lesson = f"{status.lesson} урок {status.pair} пары" if status.lessons_in_pair > 1 else f"{status.pair} пара"
+        bell = f"в {format_time(status.next_bell)} (через {status.left} мин)"
+        if status.state == self.BEFORE:
+            return f"Пары ещё не начались\n{lesson.capitalize()} начнётся {bell}"
+        if status.state == self.LESSON:
+            return f"Сейчас идёт {lesson}\nЗвонок с урока {bell}"
+        return f"Сейчас перерыв\n{lesson.capitalize()} начнётся {bell}"
+
 
-        return message_header + message
+bell_schedule = BellSchedule(config.bells)
@@ -0,0 +1,52 @@
+from datetime import date
+from typing import *
+# Компоненты проекта
+from core.my_utils import escape_for_telegram
+from core.bells import bell_schedule
+from core.academic_calendar import academic_calendar
+from core.replacements import replacements_manager, normalize_group
+from core.render_cache import render_cache
+
+
+def build_digest(target_date: date, group: str, subgroup: Optional[int]) -> str:
+    """Сводка на день для группы: неделя, звонки и замены"""
+    day_info = academic_calendar.get_day(target_date)
+    lines = [f"{target_date.strftime('%A').capitalize()}, {target_date.strftime('%d.%m.%Y')} "
+             f"({day_info.week_type} неделя)"]
+    lines.append(f"Группа {group}" + (f", подгруппа {subgroup}" if subgroup else ""))
+    lines.append("")
+
+    day_bells = bell_schedule.get_day_bells(day_info.bells_day) if day_info.bells_day else None
+    if day_bells is None:
+        lines.append("Пар нет")
+    else:
+        lines.append(f"Звонки ({day_bells['name']}):")
+        for i, pare in enumerate(day_bells["time"], start=1):
+            lines.append(f"• Пара {i}: {pare[0][0]}-{pare[-1][1]}")
+    lines.append("")
+
+    replacements = replacements_manager.get_date_replacements(target_date)
+    if replacements is None:
+        lines.append("Замены на этот день ещё не опубликованы")
+    elif not replacements.has_group(group):
+        lines.append("Замен нет")
+    else:
+        lines.append("Замены:")
+        for entry in replacements.get_group_replacements(group):
+            lines.append(f"• {entry.pair_label}: {entry.describe()}")
+    return "\n".join(lines)
+
+
+def get_digest(label: str, target_date: date, group: str, subgroup: Optional[int]) -> str:
+    """
+    Готовая к отправке сводка для группы и подгруппы.
+    label ("today"/"tomorrow") ограничивает число хранимых сводок, а версия из даты и хэша замен группы
+    перестраивает сводку только при смене дня или изменении замен именно этой группы.
+    """
+    replacements = replacements_manager.get_date_replacements(target_date)
+    published = replacements is not None
+    version = (target_date, published, replacements.group_hash(group) if published else None)
+    return render_cache.get(
+        "digest", (label, normalize_group(group), subgroup), version,
+        lambda: escape_for_telegram(build_digest(target_date, group, subgroup))
+    )
@@ -0,0 +1,140 @@
+import time
+import random
+import asyncio
+import logging
+import aiohttp
+from typing import *
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Запрос отклонён: сайт недоступен, предохранитель разомкнут"""
+
+
+class CircuitBreaker:
+    """
+    Предохранитель: после failure_threshold неудачных запросов подряд размыкается
+    и отклоняет запросы в течение reset_timeout секунд, затем пропускает один пробный запрос.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 300):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0  # Неудачные запросы подряд
+        self.opened_at: Optional[float] = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Можно ли выполнить запрос сейчас"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_progress:
+            self._trial_in_progress = True
+            return True
+        return False
+
+    def release_trial(self):
+        """Пробный запрос завершился ошибкой, не связанной с доступностью сайта: следующий запрос снова пробный"""
+        self._trial_in_progress = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_progress or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial_in_progress:
+                logging.warning(f"Circuit breaker opened for {self.reset_timeout} s")
+            self.opened_at = time.monotonic()
+        self._trial_in_progress = False
+
+
+class FetchPolicy:
+    """
+    Политика выполнения запросов к сайту колледжа: ограничение времени попытки,
+    повтор с экспоненциальной задержкой и случайным разбросом, остановка при первом успехе
+    и предохранитель от повторных обращений во время недоступности сайта.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 5,
+                 timeout: float = 15,
+                 backoff_base: float = 1,
+                 backoff_max: float = 30,
+                 breaker: CircuitBreaker = None):
+        self.max_attempts = max(1, max_attempts)
+        self.timeout = timeout  # Ограничение времени одной попытки, секунды
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        # Счётчики для контроля частоты повторов и ошибок
+        self.stats: Dict[str, int] = {
+            "requests": 0,  # Вызовы run()
+            "attempts": 0,  # Все попытки, включая повторные
+            "retries": 0,  # Повторные попытки
+            "successes": 0,
+            "failures": 0,  # Запросы, для которых исчерпаны все попытки
+            "rejected": 0  # Запросы, отклонённые предохранителем
+        }
+
+    @staticmethod
+    def is_retryable(err: BaseException) -> bool:
+        """Ошибки сети, таймауты и ответы 5xx/429 стоит повторить, остальные - нет"""
+        if isinstance(err, aiohttp.ClientResponseError):
+            return err.status >= 500 or err.status == 429
+        return isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError))
+
+    def backoff(self, attempt: int) -> float:
+        """Задержка перед повтором номер attempt (с нуля): full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def run(self, func: Callable[[float], Awaitable[T]]) -> T:
+        """
+        Выполняет func(timeout) согласно политике и возвращает её результат.
+        func получает ограничение времени попытки и применяет его к самому запросу: так ожидание
+        своей очереди (например, семафора) не считается таймаутом сайта.
+        """
+        self.stats["requests"] += 1
+        if not self.breaker.allow_request():
+            self.stats["rejected"] += 1
+            raise CircuitOpenError("College site is unavailable, request skipped")
+
+        last_error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.backoff(attempt - 1))
+            self.stats["attempts"] += 1
+            try:
+                result = await func(self.timeout)
+            except Exception as err:
+                if not self.is_retryable(err):
+                    # Ошибка не связана с доступностью сайта: состояние предохранителя не меняется
+                    self.breaker.release_trial()
+                    raise
+                last_error = err
+                logging.debug(f"Attempt {attempt + 1}/{self.max_attempts} failed: {err!r}")
+                continue
+            self.stats["successes"] += 1
+            self.breaker.record_success()
+            return result
+
+        self.stats["failures"] += 1
+        self.breaker.record_failure()
+        raise RuntimeError("Cannot connect to server!") from last_error
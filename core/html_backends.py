@@ -0,0 +1,250 @@
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import *
+# Компоненты проекта
+from core.replacement_entry import ReplacementEntry, ReplacementKind
+
+# Таблица замен: строки -> тексты ячеек <td> (без пробелов по краям)
+Table = List[List[str]]
+
+
+class PageContent(NamedTuple):
+    """Содержимое блока div#MCZ_Content страницы замен"""
+    title: Optional[str]  # Текст первого <h1> (фрагменты без пробелов по краям, склеенные вместе)
+    day: Optional[str]  # Текст первого <h2> без пробелов по краям
+    tables: List[Table]  # Таблицы с атрибутом border="1" в порядке следования
+
+
+class HtmlBackend(ABC):
+    """
+    Разборщик HTML-страниц сайта колледжа.
+    Все реализации обязаны возвращать одинаковый результат для одной и той же страницы.
+    """
+    name = ""
+
+    @abstractmethod
+    def parse_links(self, content: str) -> List[Tuple[str, str]]:
+        """Возвращает (текст ссылки, href) из строк первой таблицы с классом category"""
+
+    @abstractmethod
+    def parse_content(self, content: str) -> Optional[PageContent]:
+        """Возвращает содержимое div#MCZ_Content или None, если блока нет"""
+
+
+class HtmlParserBackend(HtmlBackend):
+    """BeautifulSoup со встроенным html.parser: медленно, но без дополнительных зависимостей"""
+    name = "html.parser"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup, SoupStrainer
+        self._soup = BeautifulSoup
+        # Строим дерево только для блока с заменами
+        self._content_strainer = SoupStrainer('div', id='MCZ_Content')
+
+    def parse_links(self, content: str) -> List[Tuple[str, str]]:
+        soup = self._soup(content, 'html.parser')
+        table = soup.find('table', class_='category')
+        if not table:
+            return []
+
+        links = []
+        for row in table.find_all('tr'):
+            link_tag = row.find('a')
+            if link_tag and link_tag.get('href') is not None:
+                links.append((link_tag.text.strip(), link_tag['href']))
+        return links
+
+    def parse_content(self, content: str) -> Optional[PageContent]:
+        soup = self._soup(content, 'html.parser', parse_only=self._content_strainer)
+        content_div = soup.find('div', id='MCZ_Content')
+        if not content_div:
+            return None
+
+        h1 = content_div.find('h1')
+        h2 = content_div.find('h2')
+        tables = [
+            [[cell.text.strip() for cell in row.find_all('td')] for row in table.find_all('tr')]
+            for table in content_div.find_all('table', border="1")
+        ]
+        return PageContent(
+            h1.get_text(strip=True) if h1 else None,
+            h2.text.strip() if h2 else None,
+            tables
+        )
+
+
+class LxmlBackend(HtmlBackend):
+    """lxml.html (libxml2)"""
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self._html = lxml.html
+
+    def parse_links(self, content: str) -> List[Tuple[str, str]]:
+        root = self._html.document_fromstring(content)
+        tables = root.xpath("//table[contains(concat(' ', normalize-space(@class), ' '), ' category ')]")
+        if not tables:
+            return []
+
+        links = []
+        for row in tables[0].iter('tr'):
+            link_tag = next(row.iter('a'), None)
+            if link_tag is not None and link_tag.get('href') is not None:
+                links.append((link_tag.text_content().strip(), link_tag.get('href')))
+        return links
+
+    def parse_content(self, content: str) -> Optional[PageContent]:
+        root = self._html.document_fromstring(content)
+        found = root.xpath("//div[@id='MCZ_Content']")
+        if not found:
+            return None
+        content_div = found[0]
+
+        h1 = next(content_div.iter('h1'), None)
+        h2 = next(content_div.iter('h2'), None)
+        tables = [
+            [[cell.text_content().strip() for cell in row.iter('td')] for row in table.iter('tr')]
+            for table in content_div.iter('table') if table.get('border') == "1"
+        ]
+        return PageContent(
+            "".join(text.strip() for text in h1.itertext()) if h1 is not None else None,
+            h2.text_content().strip() if h2 is not None else None,
+            tables
+        )
+
+
+class SelectolaxBackend(HtmlBackend):
+    """selectolax (lexbor) - самый быстрый из доступных"""
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse_links(self, content: str) -> List[Tuple[str, str]]:
+        table = self._parser(content).css_first('table.category')
+        if table is None:
+            return []
+
+        links = []
+        for row in table.css('tr'):
+            link_tag = row.css_first('a')
+            if link_tag is not None and link_tag.attributes.get('href') is not None:
+                links.append((link_tag.text().strip(), link_tag.attributes['href']))
+        return links
+
+    def parse_content(self, content: str) -> Optional[PageContent]:
+        content_div = self._parser(content).css_first('div#MCZ_Content')
+        if content_div is None:
+            return None
+
+        h1 = content_div.css_first('h1')
+        h2 = content_div.css_first('h2')
+        tables = [
+            [[cell.text().strip() for cell in row.css('td')] for row in table.css('tr')]
+            for table in content_div.css('table[border="1"]')
+        ]
+        return PageContent(
+            h1.text(separator='', strip=True) if h1 is not None else None,
+            h2.text().strip() if h2 is not None else None,
+            tables
+        )
+
+
+# Реализации в порядке предпочтения для режима "auto"
+BACKENDS: Dict[str, Type[HtmlBackend]] = {
+    SelectolaxBackend.name: SelectolaxBackend,
+    LxmlBackend.name: LxmlBackend,
+    HtmlParserBackend.name: HtmlParserBackend,
+}
+
+
+def get_backend(name: str = "auto") -> HtmlBackend:
+    """
+    Возвращает разборщик по имени.
+    В режиме "auto" выбирается первый установленный: selectolax, lxml, html.parser.
+    """
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown HTML parser: {name}")
+        return BACKENDS[name]()
+
+    for backend in BACKENDS.values():
+        try:
+            return backend()
+        except ImportError:
+            continue
+    raise RuntimeError("No HTML parser available")
+
+
+def available_backends() -> List[str]:
+    """Имена установленных разборщиков"""
+    names = []
+    for name, backend in BACKENDS.items():
+        try:
+            backend()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def build_replacements(page: PageContent) -> Dict[str, Any]:
+    """
+    Строит словарь замен из содержимого страницы:
+    {"info": {"date": datetime | None, "day": str | None}, группа: [ReplacementEntry, ...], ...}.
+    Не зависит от разборщика и настроек бота, поэтому результат разных разборщиков сравним напрямую.
+    """
+    replacements_dict = {}
+    changes_date = None
+    if page.title:
+        # Ищем дату в формате ДД.ММ.ГГГГ
+        match = re.search(r'(\d{2}\.\d{2}\.\d{4})', page.title)
+        if match:
+            try:
+                changes_date = datetime.strptime(match.group(1), '%d.%m.%Y')
+            except ValueError:
+                pass
+
+    changes_day = page.day.capitalize() if page.day is not None else None
+
+    replacements_dict["info"] = {
+        "date": changes_date,
+        "day": changes_day
+    }
+
+    for rows in page.tables:
+        for cells in rows[1:]:
+            if len(cells) != 6:
+                continue
+
+            group_name, pair_number, old_subject, new_subject, teacher, cabinet = cells
+
+            if (group_name == ""
+                    and pair_number == ""
+                    and old_subject == ""
+                    and new_subject == ""
+                    and teacher == ""
+                    and cabinet == ""):
+                continue
+
+            if group_name not in replacements_dict:
+                replacements_dict[group_name] = []
+
+            if new_subject == "-" and teacher == "-" and cabinet == "-":
+                entry = ReplacementEntry.create(ReplacementKind.PAIR_REMOVE, pair_number,
+                                                subject=old_subject)
+            elif old_subject == "-":
+                entry = ReplacementEntry.create(ReplacementKind.PAIR_ADD, pair_number,
+                                                subject=new_subject, teacher=teacher, cabinet=cabinet)
+            elif new_subject == "→" and cabinet == "":
+                entry = ReplacementEntry.create(ReplacementKind.CABINET_CHANGE, pair_number,
+                                                old_cabinet=old_subject, new_cabinet=teacher)
+            else:
+                entry = ReplacementEntry.create(ReplacementKind.PAIR_CHANGE, pair_number,
+                                                old_subject=old_subject, new_subject=new_subject,
+                                                teacher=teacher, cabinet=cabinet)
+            replacements_dict[group_name].append(entry)
+    return replacements_dict
@@ -0,0 +1,224 @@
+import time
+import bisect
+import asyncio
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from aiohttp import web
+from typing import *
+
+# Метки метрики: кортеж значений в порядке label_names
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Экранирует значение метки для текстового формата Prometheus"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    """Базовая метрика с метками"""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _format_labels(self, values: LabelValues, extra: Dict[str, str] = None) -> str:
+        pairs = list(zip(self.label_names, values)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = (f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Значения метрики: (суффикс имени, метки в текстовом виде, значение)"""
+        return ()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {value:g}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Счётчик, который только растёт"""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        return (("", self._format_labels(key), value) for key, value in self._values.items())
+
+
+class Gauge(Metric):
+    """Текущее значение, задаётся явно или вычисляется функцией при чтении метрик"""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 func: Callable[[], Union[float, Dict[LabelValues, float]]] = None, metric_type: str = None):
+        """
+        func возвращает значение или, для метрики с метками, словарь {значения меток: значение}.
+        metric_type позволяет отдавать вычисляемые счётчики (например, попадания в кэш) с типом counter.
+        """
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self.func = func
+        if metric_type is not None:
+            self.type = metric_type
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def samples(self):
+        values = self._values
+        if self.func is not None:
+            result = self.func()
+            values = result if isinstance(result, dict) else {(): result}
+        return (("", self._format_labels(key), value) for key, value in values.items())
+
+
+class Histogram(Metric):
+    """Распределение значений (длительностей) по корзинам"""
+    type = "histogram"
+
+    # Корзины в секундах: от миллисекунды до минуты
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Значения меток -> (число попаданий в каждую корзину (без накопления), сумма, количество)
+        self._values: Dict[LabelValues, List] = {}
+        # Значения наблюдаются и из потоков разбора HTML (run_in_executor), и из цикла событий
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Измеряет длительность блока with"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Декоратор асинхронной функции: измеряет её длительность (метка function - имя функции)"""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.time(function=func.__name__, **labels):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def totals(self) -> Dict[LabelValues, Tuple[int, float]]:
+        """Количество и сумма значений для каждого набора меток"""
+        with self._lock:
+            return {key: (count, total) for key, (_, total, count) in self._values.items()}
+
+    def _snapshot(self) -> List[Tuple[LabelValues, List[int], float, int]]:
+        """Согласованная копия значений: корзины, сумма и количество из одного момента"""
+        with self._lock:
+            return [(key, list(bucket_counts), total, count)
+                    for key, (bucket_counts, total, count) in self._values.items()]
+
+    def samples(self):
+        for key, bucket_counts, total, count in self._snapshot():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                yield "_bucket", self._format_labels(key, {"le": f"{bound:g}"}), cumulative
+            yield "_bucket", self._format_labels(key, {"le": "+Inf"}), count
+            yield "_sum", self._format_labels(key), total
+            yield "_count", self._format_labels(key), count
+
+
+class MetricsRegistry:
+    """Набор метрик бота, отдаётся в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Добавляет метрику; метрика с тем же именем заменяет прежнюю"""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = (), func: Callable = None,
+              metric_type: str = None) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names, func, metric_type))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        parts = []
+        for metric in self._metrics.values():
+            try:
+                parts.append(metric.render())
+            except Exception:
+                logging.exception(f"Cannot collect metric {metric.name}")
+        return "\n".join(parts) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+async def start_metrics_server(host: str = "127.0.0.1", port: int = 9100) -> web.AppRunner:
+    """Запускает HTTP-сервер, отдающий метрики по адресу /metrics. Остановка - runner.cleanup()"""
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
+
+
+async def log_metrics_periodically(interval_sec: float):
+    """Периодически выводит метрики в журнал"""
+    while True:
+        await asyncio.sleep(interval_sec)
+        logging.info("Metrics:\n" + metrics.render())
@@ -0,0 +1,159 @@
+import time
+import asyncio
+import logging
+from datetime import date
+from typing import *
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError, TelegramBadRequest, TelegramNetworkError
+# Компоненты проекта
+from core.my_utils import escape_for_telegram
+from core.replacements import Replacements, normalize_group, normalize_teacher
+from core.replacements_diff import ReplacementsDiff
+from core.render_cache import render_cache
+from core.metrics import metrics
+import database.database as database
+
+# Результаты отправки уведомлений: sent, retry, dropped, forbidden, bad_request, error
+NOTIFICATIONS_TOTAL = metrics.counter("notifications_total", "Notification send results", ("result",))
+
+
+class RateLimiter:
+    """Ограничитель частоты: не более rate событий в секунду (равномерно)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next = 0.0  # Время, раньше которого следующее событие запрещено
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+    def pause(self, seconds: float):
+        """Запрещает события на seconds секунд (ответ 429 от Telegram)"""
+        self._next = max(self._next, time.monotonic() + seconds)
+
+
+class Notifier:
+    """
+    Рассылка уведомлений о новых заменах.
+    Сообщение строится один раз для группы или преподавателя, отправка идёт через очередь
+    с общим ограничением частоты и интервалом между сообщениями в один чат.
+    """
+
+    # Повторы отправки одного сообщения при сетевых ошибках и 429
+    MAX_SEND_ATTEMPTS = 3
+
+    def __init__(self, bot: Bot, rate: float = 25, chat_interval: float = 1, workers: int = 4):
+        self.bot = bot
+        self.limiter = RateLimiter(rate)  # Общий лимит Telegram: около 30 сообщений в секунду
+        self.chat_interval = chat_interval  # Лимит Telegram для одного чата: около 1 сообщения в секунду
+        self.workers = workers
+        self.queue: asyncio.Queue[Tuple[int, str, int]] = asyncio.Queue()
+        self._chat_next: Dict[int, float] = {}  # chat_id -> время, раньше которого писать в чат нельзя
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Запускает обработчики очереди отправки"""
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Останавливает отправку (неотправленные сообщения теряются)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, chat_id: int, text: str):
+        """Ставит уже экранированное сообщение в очередь отправки"""
+        self.queue.put_nowait((chat_id, text, 0))
+
+    async def notify_changes(self, day: str, replacements: Replacements, previous: Optional[Replacements],
+                             diff: ReplacementsDiff):
+        """
+        Рассылает замены на день студентам групп, замены которых изменились,
+        и преподавателям, которых касаются изменения.
+        """
+        if replacements.date is None or replacements.date.date() < date.today():
+            return
+
+        students, teachers = await database.get_notify_recipients(database.users_db_file)
+        changed_teachers = {normalize_teacher(name)
+                            for group_diff in diff.groups.values()
+                            for entry in group_diff.entries
+                            for name in entry.teachers}
+
+        # Каждое сообщение строится один раз для группы или преподавателя
+        # и перестраивается, только когда меняются их замены
+        for user_id, group_name, _ in students:
+            group_key = normalize_group(group_name)
+            if group_key in diff:
+                self.enqueue(user_id, render_cache.get(
+                    "notify_group", (day, group_key), (replacements.date, replacements.group_hash(group_name)),
+                    lambda: self._render(replacements.format_group(group_name))
+                ))
+
+        for user_id, last_name in teachers:
+            teacher_key = normalize_teacher(last_name)
+            if teacher_key in changed_teachers:
+                self.enqueue(user_id, render_cache.get(
+                    "notify_teacher", (day, teacher_key), (replacements.date, replacements.teacher_hash(last_name)),
+                    lambda: self._render(replacements.format_teacher(last_name))
+                ))
+
+        logging.info(f"Notifications for {day} queued ({len(diff.groups)} changed groups), "
+                     f"queue size: {self.queue.qsize()}")
+
+    @staticmethod
+    def _render(text: str) -> str:
+        return escape_for_telegram("🔔 Изменения в заменах\n" + text)
+
+    async def _wait_chat(self, chat_id: int):
+        """Соблюдает интервал между сообщениями в один чат"""
+        now = time.monotonic()
+        next_allowed = self._chat_next.get(chat_id, 0.0)
+        self._chat_next[chat_id] = max(now, next_allowed) + self.chat_interval
+        if next_allowed > now:
+            await asyncio.sleep(next_allowed - now)
+        if len(self._chat_next) > 10000:
+            # Убираем чаты, для которых ограничение уже не действует
+            self._chat_next = {chat: moment for chat, moment in self._chat_next.items() if moment > now}
+
+    async def _worker(self):
+        while True:
+            chat_id, text, attempt = await self.queue.get()
+            try:
+                await self._wait_chat(chat_id)
+                await self.limiter.acquire()
+                await self.bot.send_message(chat_id, text)
+                NOTIFICATIONS_TOTAL.inc(result="sent")
+            except TelegramRetryAfter as err:
+                logging.warning(f"Flood limit, sending paused for {err.retry_after} s")
+                self.limiter.pause(err.retry_after)
+                self._retry(chat_id, text, attempt)
+            except TelegramNetworkError:
+                self._retry(chat_id, text, attempt)
+            except TelegramForbiddenError:
+                # Пользователь заблокировал бота - больше не пытаемся ему писать
+                NOTIFICATIONS_TOTAL.inc(result="forbidden")
+                await database.set_notify(chat_id, False, database.users_db_file)
+            except TelegramBadRequest as err:
+                NOTIFICATIONS_TOTAL.inc(result="bad_request")
+                logging.warning(f"Cannot send notification to {chat_id}: {err}")
+            except Exception:
+                NOTIFICATIONS_TOTAL.inc(result="error")
+                logging.exception(f"Cannot send notification to {chat_id}")
+            finally:
+                self.queue.task_done()
+
+    def _retry(self, chat_id: int, text: str, attempt: int):
+        if attempt + 1 < self.MAX_SEND_ATTEMPTS:
+            NOTIFICATIONS_TOTAL.inc(result="retry")
+            self.queue.put_nowait((chat_id, text, attempt + 1))
+        else:
+            NOTIFICATIONS_TOTAL.inc(result="dropped")
+            logging.warning(f"Notification to {chat_id} dropped after {self.MAX_SEND_ATTEMPTS} attempts")
@@ -0,0 +1,39 @@
+from typing import *
+
+
+class RenderCache:
+    """
+    Кэш готовых к отправке (экранированных) сообщений.
+    Для пары (вид, ключ) хранится одно сообщение вместе с версией данных, из которых оно построено:
+    при запросе с другой версией сообщение строится заново и заменяет старое.
+    """
+
+    def __init__(self):
+        self._data: Dict[Tuple[str, Hashable], Tuple[Hashable, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, key: Hashable, version: Hashable, render: Callable[[], str]) -> str:
+        """Возвращает сообщение из кэша или строит его через render()"""
+        cached = self._data.get((kind, key))
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        text = render()
+        self._data[(kind, key)] = (version, text)
+        return text
+
+    def invalidate(self, kind: str = None):
+        """Удаляет все сообщения вида kind (или все сообщения, если вид не указан)"""
+        if kind is None:
+            self._data.clear()
+            return
+        for cache_key in [cache_key for cache_key in self._data if cache_key[0] == kind]:
+            del self._data[cache_key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+render_cache = RenderCache()
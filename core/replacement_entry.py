@@ -0,0 +1,111 @@
+import re
+from enum import Enum
+from dataclasses import dataclass
+from typing import *
+
+
+class ReplacementKind(str, Enum):
+    """Вид замены"""
+    PAIR_REMOVE = "pair_remove"  # Пара снята
+    PAIR_ADD = "pair_add"  # Пара добавлена
+    CABINET_CHANGE = "cabinet_change"  # Перенос в другой кабинет
+    PAIR_CHANGE = "pair_change"  # Замена пары
+
+
+# Поля словаря замены (формат сайта/хранилища) для каждого вида
+_RAW_FIELDS = {
+    ReplacementKind.PAIR_REMOVE: ("subject",),
+    ReplacementKind.PAIR_ADD: ("subject", "teacher", "cabinet"),
+    ReplacementKind.CABINET_CHANGE: ("old_cabinet", "new_cabinet"),
+    ReplacementKind.PAIR_CHANGE: ("old_subject", "new_subject", "teacher", "cabinet"),
+}
+
+
+def parse_pair_number(pair: str) -> Optional[int]:
+    """Номер пары числом или None, если в ячейке не номер (например, время "13:35-14:20")"""
+    pair = pair.strip()
+    return int(pair) if pair.isdigit() else None
+
+
+def normalize_teacher(name: str) -> str:
+    """
+    Приводит фамилию преподавателя к ключу индекса: без учёта регистра, лишних пробелов и ё/е.
+    Инициалы после фамилии ("Иванов И.И.") отбрасываются.
+    """
+    words = name.casefold().replace('ё', 'е').split()
+    return words[0] if words else ""
+
+
+def normalize_group(name: str) -> str:
+    """Приводит название группы к ключу индекса: без учёта регистра, пробелов и дефисов."""
+    return re.sub(r'[\s\-‐‑–—]', '', name.casefold())
+
+
+@dataclass(frozen=True, slots=True)
+class ReplacementEntry:
+    """
+    Одна замена в расписании группы.
+    Заполнены только поля, имеющие смысл для вида замены (см. _RAW_FIELDS), остальные - None.
+    """
+    kind: ReplacementKind
+    pair: str  # Пара в том виде, как указана на сайте
+    pair_number: Optional[int] = None  # Номер пары числом, None для времени и прочего
+    subject: Optional[str] = None
+    old_subject: Optional[str] = None
+    new_subject: Optional[str] = None
+    teacher: Optional[str] = None
+    cabinet: Optional[str] = None
+    old_cabinet: Optional[str] = None
+    new_cabinet: Optional[str] = None
+
+    @classmethod
+    def create(cls, kind: ReplacementKind, pair: str, **fields: Optional[str]) -> "ReplacementEntry":
+        """Создаёт замену, разбирая номер пары"""
+        return cls(kind, pair, parse_pair_number(pair), **fields)
+
+    @classmethod
+    def from_raw(cls, raw: Sequence[Any]) -> "ReplacementEntry":
+        """Создаёт замену из формата [type, {pair_number: str, ...}]"""
+        kind, info = ReplacementKind(raw[0]), raw[1]
+        return cls.create(kind, info.get("pair_number", ""), **{field: info.get(field) for field in _RAW_FIELDS[kind]})
+
+    def to_raw(self) -> List[Any]:
+        """Возвращает замену в формате [type, {pair_number: str, ...}]"""
+        info = {"pair_number": self.pair}
+        for field in _RAW_FIELDS[self.kind]:
+            info[field] = getattr(self, field)
+        return [self.kind.value, info]
+
+    @property
+    def sort_key(self) -> Tuple[bool, int]:
+        """Ключ сортировки: сначала пары по номеру, затем все прочие (время и др.)"""
+        return self.pair_number is None, self.pair_number or 0
+
+    @property
+    def pair_label(self) -> str:
+        """Подпись пары для вывода: "2 пара" или время как на сайте"""
+        return f"{self.pair_number} пара" if self.pair_number is not None else self.pair
+
+    def describe(self, with_teacher: bool = True) -> str:
+        """Текстовое описание замены (без подписи пары)"""
+        if self.kind == ReplacementKind.PAIR_REMOVE:
+            return f"{self.subject} - снята"
+        if self.kind == ReplacementKind.CABINET_CHANGE:
+            return f"перенос из каб. {self.old_cabinet} в каб. {self.new_cabinet}"
+
+        details = []
+        if with_teacher and self.teacher and self.teacher != "-":
+            details.append(self.teacher)
+        if self.cabinet and self.cabinet != "-":
+            details.append(f"каб. {self.cabinet}")
+        suffix = f" ({', '.join(details)})" if details else ""
+        if self.kind == ReplacementKind.PAIR_ADD:
+            return f"добавлена {self.subject}{suffix}"
+        return f"{self.old_subject} → {self.new_subject}{suffix}"
+
+    @property
+    def teachers(self) -> List[str]:
+        """Список преподавателей (на сайте несколько фамилий разделяются "/")"""
+        if not self.teacher:
+            return []
+        return [name.strip() for name in self.teacher.split('/') if name.strip()]
@@ -1,13 +1,19 @@
-import re
 import locale
-import requests
 import logging
 import asyncio
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+import aiohttp
+import hashlib
+from datetime import date, datetime, timedelta
 from typing import *
 # Настройки
 from configs.config_reader import config
+# Компоненты проекта
+import database.replacements_cache as replacements_cache
+from core.fetch_policy import FetchPolicy, CircuitBreaker, CircuitOpenError
+from core.replacement_entry import ReplacementEntry, normalize_group, normalize_teacher
+from core.html_backends import HtmlBackend, get_backend, build_replacements
+from core.replacements_diff import ReplacementsDiff, diff_entries
+from core.metrics import metrics
 
 # Установка локали
 try:
@@ -16,268 +22,328 @@ except locale.Error:
     locale.setlocale(locale.LC_TIME, 'Russian_Russia.1251')  # Для Windows
 
 
+# Длительность этапов получения замен: fetch - загрузка страницы (с повторами), parse - разбор HTML,
+# build - построение записей замен, index - построение индексов Replacements, update - всё обновление
+SCRAPE_SECONDS = metrics.histogram("scrape_stage_seconds", "Duration of replacements scraping stages", ("stage",))
+
+
 class ReplacementSchedule:
-    def __init__(self, base_url: str, base_link: str):
+    def __init__(self, base_url: str, base_link: str, policy: FetchPolicy = None, max_concurrency: int = 4,
+                 backend: HtmlBackend = None):
         self.url = base_url  # Адрес сайта
         self.base_link = base_link  # Ссылка на страницу со ссылками на замены
         self.replacements_links = {}  # Найденные ссылки на замены
-
-    def fetch_replacements_links(self):
+        self.policy = policy or FetchPolicy()  # Таймауты, повторы и предохранитель запросов
+        self.backend = backend or get_backend()  # Разборщик HTML
+        self._semaphore = asyncio.Semaphore(max_concurrency)  # Ограничение числа одновременных запросов
+        self._session: Optional[aiohttp.ClientSession] = None  # Общая сессия (переиспользование соединений)
+        # Кэш страниц: адрес -> (ETag, Last-Modified, хэш содержимого, результат разбора)
+        self._pages: Dict[str, Tuple[Optional[str], Optional[str], str, Any]] = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Возвращает общую HTTP-сессию, создавая её при первом обращении"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self):
+        """Закрывает HTTP-сессию"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(self, url: str, timeout: float,
+                       headers: Dict[str, str] = None) -> Tuple[int, Optional[str], Dict[str, str]]:
+        """Одна попытка GET-запроса не дольше timeout секунд: возвращает (статус, содержимое, заголовки)"""
+        session = await self._get_session()
+        # Время ожидания в очереди семафора не входит в ограничение времени запроса
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with self._semaphore:
+            async with session.get(url, headers=headers, timeout=client_timeout) as response:
+                if response.status == 304:
+                    return response.status, None, dict(response.headers)
+                response.raise_for_status()
+                return response.status, await response.text(), dict(response.headers)
+
+    async def _fetch(self, url: str) -> str:
+        """Загружает страницу и возвращает её содержимое"""
+        with SCRAPE_SECONDS.time(stage="fetch"):
+            _, content, _ = await self.policy.run(lambda timeout: self._request(url, timeout))
+        return content
+
+    async def _fetch_page(self, url: str, build: Callable[[str], Any]) -> Any:
+        """
+        Загружает страницу условным запросом и возвращает результат build(содержимое).
+        Если сервер ответил 304 или хэш содержимого не изменился, разбор пропускается
+        и возвращается ранее полученный результат (тот же объект).
+        """
+        cached = self._pages.get(url)
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        with SCRAPE_SECONDS.time(stage="fetch"):
+            status, content, response_headers = await self.policy.run(
+                lambda timeout: self._request(url, timeout, headers)
+            )
+        if status == 304 and cached is not None:
+            return cached[3]
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        if cached is not None and cached[2] == digest:
+            result = cached[3]
+        else:
+            result = await self._parse(build, content)
+        self._pages[url] = (etag, last_modified, digest, result)
+        return result
+
+    @staticmethod
+    async def _parse(func: Callable, *args):
+        """Выполняет разбор HTML в пуле потоков, чтобы не блокировать цикл событий"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def fetch_replacements_links(self):
         url = self.url + self.base_link
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        table = soup.find('table', class_='category')
-        if not table:
-            return
-
-        rows = table.find_all('tr')
-        for row in rows:
-            link_tag = row.find('a')
-            if link_tag:
-                day_name = link_tag.text.strip()
-                link = link_tag['href']
-                full_link = f"{self.url}{link}"
-                self.replacements_links[day_name] = full_link
-
-    def get_replacements_raw(self, day_name=None):
-
-        response = None
-        max_attempts = int(config.changes["max_attempts"])
-        for attempt in range(max_attempts):
-            try:
-                if not self.replacements_links:
-                    self.fetch_replacements_links()
-
-                if day_name:
-                    day_name = day_name.capitalize()
-                    if day_name not in self.replacements_links:
-                        return None
-                    url = self.replacements_links[day_name]
-                else:
-                    today = datetime.now().strftime('%A')
-                    day_name = today.capitalize()
-                    if day_name not in self.replacements_links:
-                        return None
-                    url = self.replacements_links[day_name]
-
-                response = requests.get(url)
-            except Exception:
-                if attempt == max_attempts + 1:  # Все попытки исчерпаны
-                    raise RuntimeError("Cannot connect to server!")
-                continue
-
-        soup = BeautifulSoup(response.content, 'html.parser')
+        links = await self._fetch_page(url, self._parse_links)
+        self.replacements_links = links
 
-        replacements_dict = {}
-        content_div = soup.find('div', id='MCZ_Content')
-        if not content_div:
-            return None
+    def _parse_links(self, content: str) -> Dict[str, str]:
+        """Разбирает страницу со ссылками на замены по дням"""
+        with SCRAPE_SECONDS.time(stage="parse"):
+            return {day_name: f"{self.url}{link}" for day_name, link in self.backend.parse_links(content)}
 
-        header = content_div.find('h1')
-        changes_date = None
-        if header:
-            text = header.get_text(strip=True)
-            # Ищем дату в формате ДД.ММ.ГГГГ
-            match = re.search(r'(\d{2}\.\d{2}\.\d{4})', text)
-            if match:
-                try:
-                    changes_date = datetime.strptime(match.group(1), '%d.%m.%Y')
-                except ValueError:
-                    pass
-
-        header = content_div.find('h2')
-        changes_day = None
-        if header:
-            try:
-                changes_day = header.text.strip().capitalize()
-            except ValueError:
-                pass
+    async def get_replacements_raw(self, day_name=None):
+        if not self.replacements_links:
+            await self.fetch_replacements_links()
 
-        replacements_dict["info"] = {
-            "date": changes_date,
-            "day": changes_day
-        }
-
-        tables = content_div.find_all('table', border="1")
-        for table in tables:
-            rows = table.find_all('tr')
-            if not rows:
-                continue
+        day_name = (day_name or datetime.now().strftime('%A')).capitalize()
+        if day_name not in self.replacements_links:
+            return None
 
-            group_name_idx = 0
-            pair_number_idx = 1
-            old_subject_idx = 2
-            new_subject_idx = 3
-            teacher_idx = 4
-            cabinet_idx = 5
+        content = await self._fetch(self.replacements_links[day_name])
+        return await self._parse(self._parse_replacements, content)
 
-            for row in rows[1:]:
-                cells = row.find_all('td')
-                if len(cells) != 6:
-                    continue
+    def _parse_replacements(self, content: str):
+        """Разбирает страницу замен на один день"""
+        with SCRAPE_SECONDS.time(stage="parse"):
+            page = self.backend.parse_content(content)
+        if page is None:
+            return None
+        with SCRAPE_SECONDS.time(stage="build"):
+            return build_replacements(page)
 
-                try:
-                    group_name = cells[group_name_idx].text.strip() if group_name_idx is not None else "-"
-                    pair_number = cells[pair_number_idx].text.strip() if pair_number_idx is not None else '-'
-                    old_subject = cells[old_subject_idx].text.strip() if old_subject_idx is not None else '-'
-                    new_subject = cells[new_subject_idx].text.strip() if new_subject_idx is not None else '-'
-                    teacher = cells[teacher_idx].text.strip() if teacher_idx is not None else '-'
-                    cabinet = cells[cabinet_idx].text.strip() if cabinet_idx is not None else '-'
-                except IndexError:
-                    continue
+    async def get_replacements(self, day_name=None):
+        replacements = await self.get_replacements_raw(day_name)
+        return Replacements(replacements) if replacements is not None else f"Замены для {day_name} не найдены."
 
-                if (group_name == ""
-                        and pair_number == ""
-                        and old_subject == ""
-                        and new_subject == ""
-                        and teacher == ""
-                        and cabinet == ""):
+    async def get_all_replacements(self) -> Dict[str, "Replacements"]:
+        """
+        Загружает страницу со ссылками один раз и параллельно получает замены на все перечисленные дни.
+        Возвращает словарь {день недели: Replacements}, дни с ошибками загрузки пропускаются.
+        """
+        await self.fetch_replacements_links()
+
+        # Страницы, исчезнувшие с сайта, больше не отслеживаются
+        actual_urls = set(self.replacements_links.values()) | {self.url + self.base_link}
+        for url in set(self._pages) - actual_urls:
+            del self._pages[url]
+
+        days = list(self.replacements_links)
+        results = await asyncio.gather(
+            *(self._fetch_page(self.replacements_links[day], self._build_replacements) for day in days),
+            return_exceptions=True
+        )
+
+        replacements = {}
+        for day, result in zip(days, results):
+            if isinstance(result, Exception):
+                logging.warning(f"Cannot get changes for {day}: {result!r}")
+                # Временная ошибка не должна удалять уже полученные замены
+                cached = self._pages.get(self.replacements_links[day])
+                if cached is None:
                     continue
-
-                if group_name not in replacements_dict:
-                    replacements_dict[group_name] = []
-
-                if new_subject == "-" and teacher == "-" and cabinet == "-":
-                    replacements_dict[group_name] += [[
-                        "pair_remove",
-                        {
-                            "pair_number": pair_number,
-                            "subject": old_subject,
-                        }
-                    ]]
-                elif old_subject == "-":
-                    replacements_dict[group_name] += [[
-                        "pair_add",
-                        {
-                            "pair_number": pair_number,
-                            "subject": new_subject,
-                            "teacher": teacher,
-                            "cabinet": cabinet
-                        }
-                    ]]
-                elif new_subject == "→" and cabinet == "":
-                    replacements_dict[group_name] += [[
-                        "cabinet_change",
-                        {
-                            "pair_number": pair_number,
-                            "old_cabinet": old_subject,
-                            "new_cabinet": teacher
-                        }
-                    ]]
-                else:
-                    replacements_dict[group_name] += [[
-                        "pair_change",
-                        {
-                            "pair_number": pair_number,
-                            "old_subject": old_subject,
-                            "new_subject": new_subject,
-                            "teacher": teacher,
-                            "cabinet": cabinet
-                        }
-                    ]]
-
-        return replacements_dict if replacements_dict else None
-
-    def get_replacements(self, day_name=None):
-        replacements = self.get_replacements_raw(day_name)
-        return Replacements(replacements) if replacements is not None else f"Замены для {day_name} не найдены."
+                result = cached[3]
+            if result is not None:
+                replacements[day.capitalize()] = result
+        return replacements
+
+    def _build_replacements(self, content: str) -> Optional["Replacements"]:
+        """Разбирает страницу замен и строит объект Replacements"""
+        replacements = self._parse_replacements(content)
+        if replacements is None:
+            return None
+        with SCRAPE_SECONDS.time(stage="index"):
+            return Replacements(replacements)
 
 
 class Replacements:
-    def __init__(self, data: Dict[str, Union[List[List[Any]], Dict[str, Any]]]):
+    def __init__(self, data: Dict[str, Union[List[ReplacementEntry], List[List[Any]], Dict[str, Any]]]):
         """
         Принимает на вход словарь с заменами в формате:
         {
+            "info": {"date": datetime | None, "day": str | None},
             group_name: [
-                [type, {pair_number: str, ...}],
+                ReplacementEntry | [type, {pair_number: str, ...}],
                 ...
             ],
             ...
         }
         Сортирует замены в каждой группе по возрастанию номера пары.
-        Если значение pair_number представляет собой более одной цифры (например, время "13:35-14:20"),
-        то такие записи помещаются в конец.
+        Записи, в которых вместо номера пары указано другое (например, время "13:35-14:20"),
+        помещаются в конец.
+        Сразу строит индексы по группам и фамилиям преподавателей, чтобы запросы были поиском по словарю.
         """
-        self._data: Dict[str, List[List[Any]]] = {}
+        self._data: Dict[str, List[ReplacementEntry]] = {}
         for group, entries in data.items():
-            # Сортировка: single-digit numbers first, then все прочие (включая времена) в конец
-            def sort_key(e: List[Any]) -> float:
-                pn = e[1].get('pair_number', '')
-                # Если строка ровно из одной цифры
-                if isinstance(pn, str) and len(pn) == 1 and pn.isdigit():
-                    return int(pn)
-                # Во всех других случаях (время или многозначные числа) ставим в конец
-                return float('inf')
-
             if group == 'info':
                 continue
 
-            sorted_entries = sorted(entries, key=sort_key)
-            self._data[group] = sorted_entries
+            entries = [entry if isinstance(entry, ReplacementEntry) else ReplacementEntry.from_raw(entry)
+                       for entry in entries]
+            entries.sort(key=lambda e: e.sort_key)
+            self._data[group] = entries
 
         self._changes_date = data["info"]["date"]
         self._changes_day = data["info"]["day"]
 
-    def get_all(self) -> Dict[str, List[List[Any]]]:
-        """Возвращает все замены в исходном (отсортированном) формате."""
+        # Индекс групп: нормализованное название -> название на сайте
+        self._group_index: Dict[str, str] = {normalize_group(group): group for group in self._data}
+        # Хэши замен групп: неизменившиеся группы при сравнении обновлений пропускаются без разбора записей
+        self._group_hashes: Dict[str, int] = {normalize_group(group): hash(tuple(entries))
+                                              for group, entries in self._data.items()}
+        # Индекс преподавателей: нормализованная фамилия -> [(группа, замена), ...]
+        self._teacher_index: Dict[str, List[Tuple[str, ReplacementEntry]]] = {}
+        for group, entries in self._data.items():
+            for entry in entries:
+                keys = {normalize_teacher(name) for name in entry.teachers}
+                keys.discard("")
+                for key in keys:
+                    self._teacher_index.setdefault(key, []).append((group, entry))
+        for matches in self._teacher_index.values():
+            matches.sort(key=lambda match: match[1].sort_key)
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Replacements):
+            return NotImplemented
+        return (self._changes_date == other._changes_date
+                and self._changes_day == other._changes_day
+                and self._data == other._data)
+
+    @property
+    def date(self) -> Optional[datetime]:
+        """Дата, на которую опубликованы замены"""
+        return self._changes_date
+
+    @property
+    def day(self) -> Optional[str]:
+        """День недели, на который опубликованы замены"""
+        return self._changes_day
+
+    def to_raw(self) -> Dict[str, Union[List[List[Any]], Dict[str, Any]]]:
+        """Возвращает замены в формате [type, {pair_number: str, ...}] вместе с блоком info (для хранения)."""
+        raw = {"info": {"date": self._changes_date, "day": self._changes_day}}
+        for group, entries in self._data.items():
+            raw[group] = [entry.to_raw() for entry in entries]
+        return raw
+
+    def get_all(self) -> Dict[str, List[ReplacementEntry]]:
+        """Возвращает все замены (отсортированные)."""
         return self._data
 
     def has_group(self, group: str) -> bool:
-        """Проверяет, есть ли замены для заданной группы."""
-        return group in self._data
+        """Проверяет, есть ли замены для заданной группы (без учёта регистра, пробелов и дефисов)."""
+        return normalize_group(group) in self._group_index
 
     def get_groups(self) -> List[str]:
         """Возвращает список всех групп, для которых есть замены."""
         return list(self._data.keys())
 
-    def get_group_replacements(self, group: str) -> List[List[Any]]:
-        """Возвращает список замен для заданной группы."""
-        return self._data.get(group, [])
+    def get_group_replacements(self, group: str) -> List[ReplacementEntry]:
+        """Возвращает список замен для заданной группы (без учёта регистра, пробелов и дефисов)."""
+        site_group = self._group_index.get(normalize_group(group))
+        return self._data[site_group] if site_group is not None else []
+
+    def group_hash(self, group: str) -> Optional[int]:
+        """Хэш замен группы (None, если замен нет) - меняется только при изменении замен этой группы"""
+        return self._group_hashes.get(normalize_group(group))
+
+    def diff(self, previous: Optional["Replacements"]) -> ReplacementsDiff:
+        """
+        Изменения по группам относительно предыдущих замен на тот же день.
+        Если предыдущих замен нет или они на другую дату, все замены считаются новыми.
+        """
+        same_day = previous is not None and previous._changes_date == self._changes_date
+        previous_hashes = previous._group_hashes if same_day else {}
+
+        groups = {}
+        for group_key in self._group_hashes.keys() | previous_hashes.keys():
+            if self._group_hashes.get(group_key) == previous_hashes.get(group_key):
+                continue
+            old_group = previous._group_index.get(group_key) if same_day else None
+            new_group = self._group_index.get(group_key)
+            groups[group_key] = diff_entries(
+                new_group or old_group,
+                previous._data[old_group] if old_group else [],
+                self._data[new_group] if new_group else []
+            )
+        return ReplacementsDiff(groups)
 
     def has_teacher(self, last_name: str) -> bool:
         """Проверяет, есть ли замены, связанные с преподавателем (по фамилии)."""
-        for entries in self._data.values():
-            for entry in entries:
-                _, info = entry
-                teacher_field = info.get('teacher')
-                if teacher_field:
-                    for name in teacher_field.split('/'):
-                        if name.strip() == last_name:
-                            return True
-        return False
-
-    def get_teacher_replacements(self, last_name: str) -> List[List[Any]]:
+        return normalize_teacher(last_name) in self._teacher_index
+
+    def teacher_hash(self, last_name: str) -> Optional[int]:
+        """Хэш замен преподавателя (None, если замен нет)"""
+        matches = self._teacher_index.get(normalize_teacher(last_name))
+        return hash(tuple(matches)) if matches else None
+
+    def get_teacher_replacements(self, last_name: str) -> List[Tuple[str, ReplacementEntry]]:
         """
-        Возвращает все замены для преподавателя по фамилии.
-        Каждый элемент: [group, type, pair_number, ...other fields без 'teacher']
-        Отсортировано: сначала single-digit номера, затем все прочие (время и др.).
+        Возвращает все замены для преподавателя по фамилии (без учёта регистра, пробелов и ё/е).
+        Каждый элемент: (группа, замена).
+        Отсортировано по номеру пары, записи без номера (время и др.) - в конце.
         """
-        matches: List[List[Any]] = []
-        for group, entries in self._data.items():
-            for entry in entries:
-                entry_type, info = entry
-                teacher_field = info.get('teacher')
-                if not teacher_field:
-                    continue
-                names = [n.strip() for n in teacher_field.split('/')]
-                if last_name in names:
-                    base = [group, entry_type, info.get('pair_number', '')]
-                    for key, value in info.items():
-                        if key in ('teacher', 'pair_number'):
-                            continue
-                        base.append(value)
-                    matches.append(base)
-
-        # сортировка с учётом условия: single-digit first, остальное в конец
-        def sort_key_teacher(e: List[Any]) -> float:
-            pn = e[2]
-            if isinstance(pn, str) and len(pn) == 1 and pn.isdigit():
-                return int(pn)
-            return float('inf')
-
-        matches.sort(key=sort_key_teacher)
-        return matches
+        return list(self._teacher_index.get(normalize_teacher(last_name), []))
+
+    def format_header(self) -> str:
+        """Заголовок с днём и датой замен"""
+        header = "Замены"
+        if self._changes_day:
+            header += f" на {self._changes_day.lower()}"
+        if self._changes_date:
+            header += f" {self._changes_date.strftime('%d.%m.%Y')}"
+        return header
+
+    def format_group(self, group: str) -> str:
+        """Получить отформатированные текстом замены группы"""
+        entries = self.get_group_replacements(group)
+        if not entries:
+            return f"{self.format_header()}\nДля группы {group} замен нет"
+
+        lines = [f"{self.format_header()}", f"Группа {self._group_index[normalize_group(group)]}:"]
+        for entry in entries:
+            lines.append(f"• {entry.pair_label}: {entry.describe()}")
+        return "\n".join(lines)
+
+    def format_teacher(self, last_name: str) -> str:
+        """Получить отформатированные текстом замены преподавателя"""
+        matches = self.get_teacher_replacements(last_name)
+        if not matches:
+            return f"{self.format_header()}\nДля преподавателя {last_name} замен нет"
+
+        lines = [f"{self.format_header()}", f"Преподаватель {last_name}:"]
+        for group, entry in matches:
+            lines.append(f"• {entry.pair_label}, {group}: {entry.describe(with_teacher=False)}")
+        return "\n".join(lines)
 
     def is_current_week(self) -> bool:
         """
@@ -305,28 +371,125 @@ class Replacements:
         return self._changes_day == target_day
 
 
+# Обработчик изменения замен: (день недели, новые замены, предыдущие замены или None, изменения по группам)
+ChangesListener = Callable[[str, "Replacements", Optional["Replacements"], ReplacementsDiff], Awaitable[Any]]
+
+
 class ReplacementManager:
     def __init__(self, replacements_parser):
-        self.today_replacements = None
-        self.next_working_day_replacements = None
+        self.replacements: Dict[str, Replacements] = {}  # Замены по дням недели
         self.parser = replacements_parser
+        self.loaded = False  # Замены уже были получены (с сайта или из кэша)
+        self.version = 0  # Увеличивается при каждом изменении замен (для кэшей производных данных)
+        self._listeners: List[ChangesListener] = []
 
-    async def update_replacements(self):
-        """Получение и обновление замен"""
-        logging.info("Updating changes!")
+    def add_listener(self, listener: ChangesListener):
+        """
+        Подписывает обработчик на появление и изменение замен.
+        Первое заполнение после запуска без сохранённых замен изменением не считается.
+        """
+        self._listeners.append(listener)
+
+    async def _notify_listeners(self, day: str, previous: Optional[Replacements], diff: ReplacementsDiff):
+        for listener in self._listeners:
+            try:
+                await listener(day, self.replacements[day], previous, diff)
+            except Exception:
+                logging.exception(f"Changes listener {listener!r} failed for {day}")
 
+    @property
+    def today_replacements(self) -> Optional[Replacements]:
+        """Замены на сегодня"""
         today = datetime.now().date()
-        next_working_day = self._calculate_next_working_day(today)
+        return self.get_day_replacements(today.strftime('%A'))
+
+    @property
+    def next_working_day_replacements(self) -> Optional[Replacements]:
+        """Замены на следующий рабочий день"""
+        next_working_day = self._calculate_next_working_day(datetime.now().date())
+        return self.get_day_replacements(next_working_day.strftime('%A'))
+
+    def get_day_replacements(self, day_name: str) -> Optional[Replacements]:
+        """Возвращает замены на день недели из кэша"""
+        return self.replacements.get(day_name.capitalize())
+
+    def get_date_replacements(self, target_date: date) -> Optional[Replacements]:
+        """Возвращает замены на дату из кэша (None, если на эту дату замены ещё не опубликованы)"""
+        replacements = self.get_day_replacements(target_date.strftime('%A'))
+        if replacements is None or replacements.date is None or replacements.date.date() != target_date:
+            return None
+        return replacements
 
-        self.today_replacements = self.parser.get_replacements(today.strftime('%A').capitalize())
-        self.next_working_day_replacements = self.parser.get_replacements(next_working_day.strftime('%A').capitalize())
+    def get_upcoming_replacements(self, from_date: date = None) -> List[Replacements]:
+        """Возвращает замены на даты начиная с from_date (по умолчанию - с сегодня) в порядке дат"""
+        from_date = from_date or date.today()
+        upcoming = [replacements for replacements in self.replacements.values()
+                    if replacements.date is not None and replacements.date.date() >= from_date]
+        return sorted(upcoming, key=lambda replacements: replacements.date)
 
-        logging.info("Changes updated!")
+    async def update_replacements(self) -> Set[str]:
+        """
+        Получение и обновление замен.
+        Возвращает множество дней недели, замены на которые появились или изменились.
+        """
+        logging.info("Updating changes!")
+
+        with SCRAPE_SECONDS.time(stage="update"):
+            replacements = await self.parser.get_all_replacements()
+        # Сравнение по хэшам групп: разбираются только группы, замены которых изменились
+        diffs = {}
+        for day, day_replacements in replacements.items():
+            previous_day = self.replacements.get(day)
+            diff = day_replacements.diff(previous_day)
+            if diff or previous_day is None or previous_day.date != day_replacements.date \
+                    or previous_day.day != day_replacements.day:
+                diffs[day] = diff
+        changed = set(diffs)
+        removed = set(self.replacements) - set(replacements)
+        previous = self.replacements
+        self.replacements = replacements
+        if changed or removed:
+            self.version += 1
+
+        if (changed or removed) and replacements_cache.replacements_db_file is not None:
+            await replacements_cache.save_replacements(
+                {day: day_replacements.to_raw() for day, day_replacements in replacements.items()}
+            )
+            # В архив попадают изменившиеся группы, чтобы замены сохранялись после ротации страниц
+            await replacements_cache.archive_replacements(
+                (replacements[day].date.date(),
+                 {group_diff.group: replacements[day].get_group_replacements(group_diff.group)
+                  for group_diff in diffs[day].groups.values()})
+                for day in changed if replacements[day].date is not None
+            )
+
+        logging.info(f"Changes updated! Changed days: "
+                     f"{', '.join(f'{day} ({len(diffs[day].groups)} groups)' for day in changed) or '-'}")
+
+        if self.loaded:
+            for day in changed:
+                await self._notify_listeners(day, previous.get(day), diffs[day])
+        self.loaded = True
+        return changed
+
+    async def load_cache(self):
+        """Загружает сохранённые на диске замены, чтобы отвечать сразу после запуска"""
+        cached = await replacements_cache.load_replacements()
+        self.replacements = {day: Replacements(data) for day, data in cached.items()}
+        self.loaded = self.loaded or bool(self.replacements)
+        self.version += 1
+        logging.info(f"Changes loaded from cache! Days: {', '.join(self.replacements) or '-'}")
 
     async def start_periodic_updates(self, period_min: int = 30):
         """Запуск периодического обновления"""
         while True:
-            await self.update_replacements()
+            try:
+                await self.update_replacements()
+            except CircuitOpenError as err:
+                logging.warning(f"Changes update skipped: {err}")
+            except Exception:
+                logging.exception("Changes update failed!")
+            logging.info(f"Fetch stats: {self.parser.policy.stats}")
             await asyncio.sleep(period_min * 60)
 
     def _calculate_next_working_day(self, today):
@@ -335,4 +498,23 @@ class ReplacementManager:
         return today + timedelta(days=1)
 
 
-replacements_manager = ReplacementManager(ReplacementSchedule(config.changes["base_url"], config.changes["base_link"]))
+replacements_manager = ReplacementManager(ReplacementSchedule(
+    config.changes["base_url"],
+    config.changes["base_link"],
+    FetchPolicy(
+        max_attempts=int(config.changes.get("max_attempts", 5)),
+        timeout=config.changes.get("timeout", 15),
+        backoff_base=config.changes.get("backoff_base", 1),
+        backoff_max=config.changes.get("backoff_max", 30),
+        breaker=CircuitBreaker(
+            failure_threshold=config.changes.get("breaker_threshold", 3),
+            reset_timeout=config.changes.get("breaker_reset", 300)
+        )
+    ),
+    config.changes.get("max_concurrency", 4),
+    get_backend(config.changes.get("parser", "auto"))
+))
+
+metrics.gauge("scrape_requests_total", "Site request counters of the fetch policy", ("event",),
+              func=lambda: {(event,): value for event, value in replacements_manager.parser.policy.stats.items()},
+              metric_type="counter")
@@ -0,0 +1,57 @@
+from typing import *
+# Компоненты проекта
+from core.replacement_entry import ReplacementEntry
+
+
+class GroupDiff(NamedTuple):
+    """Изменения замен одной группы между двумя обновлениями"""
+    group: str  # Название группы на сайте
+    added: List[ReplacementEntry]
+    removed: List[ReplacementEntry]
+    modified: List[Tuple[ReplacementEntry, ReplacementEntry]]  # (было, стало) для одной и той же пары
+
+    @property
+    def entries(self) -> List[ReplacementEntry]:
+        """Все затронутые замены: новые, удалённые и обе версии изменённых"""
+        return self.added + self.removed + [entry for pair in self.modified for entry in pair]
+
+
+class ReplacementsDiff:
+    """Изменения замен на день: по нормализованному названию группы - изменения этой группы"""
+
+    def __init__(self, groups: Dict[str, GroupDiff] = None):
+        self.groups = groups or {}
+
+    def __bool__(self) -> bool:
+        return bool(self.groups)
+
+    def __contains__(self, group_key: str) -> bool:
+        return group_key in self.groups
+
+    def __repr__(self) -> str:
+        return f"ReplacementsDiff({', '.join(diff.group for diff in self.groups.values())})"
+
+
+def diff_entries(group: str, old: List[ReplacementEntry], new: List[ReplacementEntry]) -> GroupDiff:
+    """
+    Сравнивает замены группы. Замены сопоставляются по паре: если для пары одна запись исчезла,
+    а другая появилась, это изменение, остальные записи - добавленные или удалённые.
+    """
+    old_by_pair: Dict[str, List[ReplacementEntry]] = {}
+    for entry in old:
+        old_by_pair.setdefault(entry.pair, []).append(entry)
+    new_by_pair: Dict[str, List[ReplacementEntry]] = {}
+    for entry in new:
+        new_by_pair.setdefault(entry.pair, []).append(entry)
+
+    added, removed, modified = [], [], []
+    for pair in old_by_pair.keys() | new_by_pair.keys():
+        old_entries = [entry for entry in old_by_pair.get(pair, []) if entry not in new_by_pair.get(pair, [])]
+        new_entries = [entry for entry in new_by_pair.get(pair, []) if entry not in old_by_pair.get(pair, [])]
+        modified += zip(old_entries, new_entries)
+        removed += old_entries[len(new_entries):]
+        added += new_entries[len(old_entries):]
+
+    sort_key = lambda entry: entry.sort_key
+    modified.sort(key=lambda change: change[1].sort_key)
+    return GroupDiff(group, sorted(added, key=sort_key), sorted(removed, key=sort_key), modified)
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+import secrets
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from typing import *
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot, path: str, secret_token: Optional[str]) -> web.Application:
+    """
+    Создаёт aiohttp-приложение, принимающее обновления Telegram по адресу path.
+    Запросы без заголовка X-Telegram-Bot-Api-Secret-Token со значением secret_token отклоняются.
+    """
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=secret_token).register(app, path=path)
+    # События запуска и остановки диспетчера привязываются к жизненному циклу приложения
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, webhook_config: Dict):
+    """
+    Запускает приём обновлений через вебхук и регистрирует его в Telegram.
+    Работает до отмены задачи.
+    """
+    path = webhook_config.get("webhook_path", "/webhook")
+    # Без заданного секрета используется случайный: он действует до перезапуска бота
+    secret_token = webhook_config.get("secret_token") or secrets.token_urlsafe(32)
+
+    app = create_webhook_app(dp, bot, path, secret_token)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, webhook_config.get("host", "0.0.0.0"), webhook_config.get("port", 8080))
+    await site.start()
+    try:
+        await bot.set_webhook(
+            webhook_config["webhook_url"].rstrip("/") + path,
+            secret_token=secret_token,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+        logging.info(f"Webhook mode started on {webhook_config.get('host', '0.0.0.0')}:"
+                     f"{webhook_config.get('port', 8080)}{path}")
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
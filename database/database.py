@@ -1,12 +1,99 @@
+import time
+import asyncio
 import aiosqlite
+from contextlib import asynccontextmanager
 from typing import *
+# Компоненты проекта
+from database.profile_cache import ProfileCache
+from core.metrics import metrics
 
 # Файл базы данных
 users_db_file = None
+# Общее соединение с users_db_file, открывается в init_users_db
+_connection: Optional[aiosqlite.Connection] = None
+# Транзакции на общем соединении выполняются по очереди
+_write_lock = asyncio.Lock()
+
+# Кэш списка групп (меняется редко): (время загрузки, строки)
+GROUPS_CACHE_TTL = 600  # Секунды, страхует от правок базы в обход бота
+_groups_cache: Optional[Tuple[float, list]] = None
+# Увеличивается при каждом изменении списка групп
+groups_version = 0
+
+# Кэш профилей пользователей основного файла, сбрасывается функциями, изменяющими пользователей
+PROFILE_CACHE_SIZE = 10000
+PROFILE_CACHE_TTL = 600  # Секунды, страхует от правок базы в обход бота
+profile_cache = ProfileCache(PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL)
+
+
+# Длительность функций базы данных (метка function), включая ожидание очереди записи
+DB_QUERY_SECONDS = metrics.histogram("db_query_seconds", "Duration of users database functions", ("function",))
+
+# Размер кэша подготовленных запросов соединения
+CACHED_STATEMENTS = 256
+# Настройки соединения
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL;",  # Чтение не блокируется записью
+    "PRAGMA synchronous = NORMAL;",  # В режиме WAL безопасно и без fsync на каждую транзакцию
+    "PRAGMA foreign_keys = ON;",  # Разрешение ключей из других таблиц
+    "PRAGMA busy_timeout = 5000;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA cache_size = -8000;",  # 8 МБ
+)
+
+
+def _get_db_file(db_path: str = None) -> str:
+    db_file = db_path or users_db_file
+    if not db_file:
+        raise ValueError("Not selected name of SQLite database file")
+    return db_file
+
+
+async def _open(db_file: str) -> aiosqlite.Connection:
+    """Открывает соединение с настройками PRAGMAS"""
+    db = await aiosqlite.connect(db_file, cached_statements=CACHED_STATEMENTS)
+    for pragma in PRAGMAS:
+        await db.execute(pragma)
+    return db
+
+
+@asynccontextmanager
+async def _connect(db_path: str = None) -> AsyncIterator[aiosqlite.Connection]:
+    """
+    Возвращает общее соединение для основного файла базы данных.
+    Для любого другого файла открывает временное соединение.
+    """
+    db_file = _get_db_file(db_path)
+    if _connection is not None and db_file == users_db_file:
+        yield _connection
+        return
+    db = await _open(db_file)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+@asynccontextmanager
+async def _transaction(db_path: str = None) -> AsyncIterator[aiosqlite.Connection]:
+    """
+    Выполняет запросы в одной транзакции: фиксирует при успехе, откатывает при ошибке.
+    Чтение профилей идёт через то же соединение и может увидеть ещё не зафиксированные строки,
+    поэтому после отката кэш профилей сбрасывается целиком (затронутые пользователи здесь неизвестны).
+    """
+    async with _write_lock:
+        async with _connect(db_path) as db:
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                profile_cache.invalidate()
+                raise
+            await db.commit()
 
 
 async def init_users_db(file: str = None):
-    global users_db_file
+    global users_db_file, _connection
     if file is not None:
         db_file = file
         if users_db_file is None:
@@ -15,9 +102,9 @@ async def init_users_db(file: str = None):
         db_file = users_db_file
     else:
         raise ValueError("Not selected name of SQLite database file")
-    async with aiosqlite.connect(db_file) as db:
-        # Разрешение ключей из других таблиц
-        await db.execute("PRAGMA foreign_keys = ON;")
+    if _connection is None and db_file == users_db_file:
+        _connection = await _open(db_file)
+    async with _transaction(db_file) as db:
         # Создание таблицы пользователей если отсутствует
         await db.execute('''
                     CREATE TABLE IF NOT EXISTS users (
@@ -90,108 +177,237 @@ async def init_users_db(file: str = None):
                     ('Юридическое',)
                 ]
             )
-        # Сохранить изменения
-        await db.commit()
 
 
+async def close_users_db():
+    """Закрывает общее соединение с базой данных"""
+    global _connection
+    if _connection is not None:
+        async with _write_lock:
+            await _connection.close()
+        _connection = None
+
+
+@DB_QUERY_SECONDS.timed()
 async def get_groups(db_path: str = None) -> Union[list[tuple[int, str, str]], list[None]]:
-    """Возвращает список (group_id, faculty_name, group_name), отсортированный по факультету и имени группы."""
-    global users_db_file
-    if db_path is not None:
-        db_file = db_path
-    elif users_db_file is not None:
-        db_file = users_db_file
-    else:
-        raise ValueError("Not selected name of SQLite database file")
-    async with aiosqlite.connect(db_file) as db:
+    """
+    Возвращает список (group_id, faculty_name, group_name), отсортированный по факультету и имени группы.
+    Для основного файла базы данных список кэшируется, изменять его нельзя.
+    """
+    global _groups_cache, groups_version
+    is_main_db = _get_db_file(db_path) == users_db_file
+    if is_main_db and _groups_cache is not None and time.monotonic() - _groups_cache[0] < GROUPS_CACHE_TTL:
+        return _groups_cache[1]
+
+    async with _connect(db_path) as db:
         cursor = await db.execute(
             '''SELECT g.group_id, f.faculty_name, g.group_name
                FROM groups g
                JOIN faculty f USING(faculty_id)
                ORDER BY f.faculty_name, g.group_name'''
         )
-        return await cursor.fetchall()
+        rows = await cursor.fetchall()
+
+    if is_main_db:
+        if _groups_cache is None or _groups_cache[1] != rows:
+            groups_version += 1
+        _groups_cache = (time.monotonic(), rows)
+    return rows
+
+
+def invalidate_groups_cache() -> None:
+    """Сбрасывает кэш списка групп (после изменения таблиц groups/faculty)"""
+    global _groups_cache, groups_version
+    _groups_cache = None
+    groups_version += 1
+
+
+@DB_QUERY_SECONDS.timed()
+async def add_group(group_name: str, faculty_id: int, course: int = None, start_date: str = None,
+                    db_path: str = None) -> int:
+    """Добавляет или обновляет группу и возвращает её group_id"""
+    async with _transaction(db_path) as db:
+        await db.execute(
+            '''INSERT INTO groups (group_name, start_date, course, faculty_id)
+               VALUES (?,?,?,?)
+               ON CONFLICT(group_name) DO UPDATE SET
+                   start_date = excluded.start_date,
+                   course = excluded.course,
+                   faculty_id = excluded.faculty_id''',
+            (group_name, start_date, course, faculty_id)
+        )
+        cursor = await db.execute("SELECT group_id FROM groups WHERE group_name = ?", (group_name,))
+        group_id = (await cursor.fetchone())[0]
+    invalidate_groups_cache()
+    return group_id
 
 
+@DB_QUERY_SECONDS.timed()
 async def create_user(user_id: int, role: str, db_path: str = None) -> None:
     """Создаёт или обновляет запись в users"""
-    global users_db_file
-    if db_path is not None:
-        db_file = db_path
-    elif users_db_file is not None:
-        db_file = users_db_file
-    else:
-        raise ValueError("Not selected name of SQLite database file")
-    async with aiosqlite.connect(db_file) as db:
+    async with _transaction(db_path) as db:
         await db.execute(
             "INSERT OR REPLACE INTO users(user_id, role) VALUES(?,?)",
             (user_id, role)
         )
-        await db.commit()
+    profile_cache.invalidate(user_id)
 
 
+@DB_QUERY_SECONDS.timed()
 async def save_student(user_id: int, group_id: int, subgroup: int, first_name: str | None, last_name: str,
                        db_path: str = None) -> None:
     """Сохраняет данные студента в таблицу students"""
-    global users_db_file
-    if db_path is not None:
-        db_file = db_path
-    elif users_db_file is not None:
-        db_file = users_db_file
-    else:
-        raise ValueError("Not selected name of SQLite database file")
-    async with aiosqlite.connect(db_file) as db:
+    async with _transaction(db_path) as db:
         await db.execute(
             '''INSERT OR REPLACE INTO students
                (user_id, group_id, subgroup, first_name, last_name)
                VALUES(?,?,?,?,?)''',
             (user_id, group_id, subgroup, first_name, last_name)
         )
-        await db.commit()
+    profile_cache.invalidate(user_id)
 
 
+@DB_QUERY_SECONDS.timed()
 async def save_teacher(user_id: int, first_name: str | None, last_name: str, db_path: str = None) -> None:
     """Сохраняет данные преподавателя в таблицу teachers"""
-    global users_db_file
-    if db_path is not None:
-        db_file = db_path
-    elif users_db_file is not None:
-        db_file = users_db_file
+    async with _transaction(db_path) as db:
+        await db.execute(
+            '''INSERT OR REPLACE INTO teachers
+               (user_id, first_name, last_name)
+               VALUES(?,?,?)''',
+            (user_id, first_name, last_name)
+        )
+    profile_cache.invalidate(user_id)
+
+
+async def _insert_registration(db: aiosqlite.Connection, user_id: int, role: str, group_id: int | None,
+                               subgroup: int | None, first_name: str | None, last_name: str | None) -> None:
+    """Записывает пользователя и строку его роли (без фиксации транзакции)"""
+    await db.execute(
+        "INSERT OR REPLACE INTO users(user_id, role) VALUES(?,?)",
+        (user_id, role)
+    )
+    if role == "student":
+        await db.execute(
+            '''INSERT OR REPLACE INTO students
+               (user_id, group_id, subgroup, first_name, last_name)
+               VALUES(?,?,?,?,?)''',
+            (user_id, group_id, subgroup, first_name, last_name)
+        )
     else:
-        raise ValueError("Not selected name of SQLite database file")
-    async with aiosqlite.connect(db_file) as db:
         await db.execute(
             '''INSERT OR REPLACE INTO teachers
                (user_id, first_name, last_name)
                VALUES(?,?,?)''',
             (user_id, first_name, last_name)
         )
-        await db.commit()
 
 
-async def user_exists(user_id: int, db_path: str = None) -> bool:
-    """Проверяет наличие пользователя в таблице users"""
-    global users_db_file
-    db_file = db_path or users_db_file
-    if not db_file:
-        raise ValueError("Database file not specified")
+@DB_QUERY_SECONDS.timed()
+async def register_user(user_id: int, role: str, last_name: str | None, first_name: str | None = None,
+                        group_id: int = None, subgroup: int = None, db_path: str = None) -> None:
+    """Атомарно записывает пользователя в users и его данные в students или teachers"""
+    async with _transaction(db_path) as db:
+        await _insert_registration(db, user_id, role, group_id, subgroup, first_name, last_name)
+    profile_cache.invalidate(user_id)
+
+
+class UserProfile(NamedTuple):
+    """Профиль пользователя. Для преподавателя поля группы и подгруппы - None"""
+    user_id: int
+    role: str
+    group_id: Optional[int]
+    group_name: Optional[str]
+    subgroup: Optional[int]
+    last_name: Optional[str]
+    notify_enabled: bool
 
-    async with aiosqlite.connect(db_file) as db:
+    @property
+    def is_complete(self) -> bool:
+        """
+        Есть ли данные роли: группа у студента, фамилия у преподавателя.
+        Без них есть только запись в users (прерванная или старая регистрация).
+        """
+        return (self.last_name if self.role == "teacher" else self.group_name) is not None
+
+
+@DB_QUERY_SECONDS.timed()
+async def get_user_profile(user_id: int, db_path: str = None) -> Optional[UserProfile]:
+    """
+    Возвращает профиль пользователя или None, если пользователь не зарегистрирован.
+    Для основного файла базы данных профили кэшируются (см. profile_cache).
+    """
+    is_main_db = _get_db_file(db_path) == users_db_file
+    if is_main_db:
+        found, profile = profile_cache.get(user_id)
+        if found:
+            return profile
+        generation = profile_cache.generation
+
+    async with _connect(db_path) as db:
         cursor = await db.execute(
-            "SELECT 1 FROM users WHERE user_id = ?",
+            '''SELECT u.user_id, u.role, s.group_id, g.group_name, s.subgroup,
+                      COALESCE(s.last_name, t.last_name), u.notify_enabled
+               FROM users u
+               LEFT JOIN students s USING(user_id)
+               LEFT JOIN groups g ON g.group_id = s.group_id
+               LEFT JOIN teachers t ON t.user_id = u.user_id
+               WHERE u.user_id = ?''',
             (user_id,)
         )
-        return bool(await cursor.fetchone())
+        row = await cursor.fetchone()
+
+    profile = UserProfile(*row[:-1], bool(row[-1])) if row else None
+    if is_main_db:
+        profile_cache.put(user_id, profile, generation)
+    return profile
+
+
+@DB_QUERY_SECONDS.timed()
+async def get_notify_recipients(db_path: str = None) -> Tuple[list[tuple[int, str, int]], list[tuple[int, str]]]:
+    """
+    Возвращает получателей уведомлений с включёнными уведомлениями:
+    студенты (user_id, group_name, subgroup) и преподаватели (user_id, last_name).
+    """
+    async with _connect(db_path) as db:
+        cursor = await db.execute(
+            '''SELECT s.user_id, g.group_name, s.subgroup
+               FROM students s
+               JOIN users u USING(user_id)
+               JOIN groups g USING(group_id)
+               WHERE u.notify_enabled = 1'''
+        )
+        students = await cursor.fetchall()
+        cursor = await db.execute(
+            '''SELECT t.user_id, t.last_name
+               FROM teachers t
+               JOIN users u USING(user_id)
+               WHERE u.notify_enabled = 1'''
+        )
+        teachers = await cursor.fetchall()
+    return students, teachers
 
 
+@DB_QUERY_SECONDS.timed()
+async def set_notify(user_id: int, enabled: bool, db_path: str = None) -> None:
+    """Включает или выключает уведомления пользователя"""
+    async with _transaction(db_path) as db:
+        await db.execute(
+            "UPDATE users SET notify_enabled = ? WHERE user_id = ?",
+            (int(enabled), user_id)
+        )
+    profile_cache.invalidate(user_id)
+
+
+async def user_exists(user_id: int, db_path: str = None) -> bool:
+    """Проверяет наличие пользователя в таблице users (через кэш профилей)"""
+    return await get_user_profile(user_id, db_path) is not None
+
+
+@DB_QUERY_SECONDS.timed()
 async def delete_user(user_id: int, db_path: str = None) -> bool:
     """Удаляет пользователя из всех таблиц через каскадное удаление"""
-    global users_db_file
-    db_file = db_path or users_db_file
-    if not db_file:
-        raise ValueError("Database file not specified")
-
-    async with aiosqlite.connect(db_file) as db:
+    async with _transaction(db_path) as db:
         await db.execute("DELETE FROM students WHERE user_id = ?", (user_id,))
         await db.execute("DELETE FROM teachers WHERE user_id = ?", (user_id,))
         await db.execute("DELETE FROM admins WHERE user_id = ?", (user_id,))
@@ -200,5 +416,6 @@ async def delete_user(user_id: int, db_path: str = None) -> bool:
             "DELETE FROM users WHERE user_id = ?",
             (user_id,)
         )
-        await db.commit()
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+    profile_cache.invalidate(user_id)
+    return deleted
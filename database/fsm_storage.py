@@ -0,0 +1,169 @@
+import json
+import time
+import asyncio
+import aiosqlite
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey, StateType, DefaultKeyBuilder
+from aiogram.fsm.storage.memory import MemoryStorage
+from typing import *
+# Компоненты проекта
+from database.database import PRAGMAS
+
+
+class _Record(NamedTuple):
+    state: Optional[str]
+    data: Dict[str, Any]
+    updated_at: float  # Время последнего изменения (для state_ttl)
+    cached_at: float  # Время чтения из базы или записи (для cache_ttl)
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище состояний FSM в файле SQLite: незавершённая регистрация переживает перезапуск бота.
+    Записи сразу пишутся в базу и в кэш в памяти, чтение идёт из кэша.
+    Состояния, не менявшиеся дольше state_ttl секунд, считаются устаревшими и удаляются.
+    Записи кэша перечитываются из базы через cache_ttl секунд: при нескольких процессах бота
+    на одном файле cache_ttl задаёт, насколько долго процесс может не видеть чужие изменения
+    (0 - читать всегда из базы).
+    """
+
+    # Период удаления устаревших состояний из базы, секунды
+    PURGE_INTERVAL = 600
+
+    def __init__(self, path: str, state_ttl: Optional[float] = 86400, cache_ttl: Optional[float] = 60):
+        self.path = path
+        self.state_ttl = state_ttl
+        self.cache_ttl = cache_ttl
+        self.key_builder = DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._db: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        self._cache: Dict[str, _Record] = {}
+        self._last_purge = 0.0
+
+    async def _get_db(self) -> aiosqlite.Connection:
+        if self._db is None:
+            db = await aiosqlite.connect(self.path)
+            for pragma in PRAGMAS:
+                await db.execute(pragma)
+            await db.execute('''
+                        CREATE TABLE IF NOT EXISTS fsm (
+                            key TEXT primary key,
+                            state TEXT,
+                            data TEXT NOT NULL,
+                            updated_at REAL NOT NULL
+                        )
+                    ''')
+            await db.commit()
+            self._db = db
+        return self._db
+
+    def _is_expired(self, updated_at: float, now: float) -> bool:
+        return self.state_ttl is not None and now - updated_at > self.state_ttl
+
+    async def _load(self, key: str) -> _Record:
+        now = time.time()
+        record = self._cache.get(key)
+        if record is None or (self.cache_ttl is not None and now - record.cached_at >= self.cache_ttl):
+            # Под блокировкой: прочитанная строка не перезапишет в кэше более новую запись _modify
+            async with self._lock:
+                db = await self._get_db()
+                cursor = await db.execute("SELECT state, data, updated_at FROM fsm WHERE key = ?", (key,))
+                row = await cursor.fetchone()
+                record = _Record(row[0], json.loads(row[1]), row[2], now) if row else _Record(None, {}, now, now)
+                self._cache[key] = record
+        if self._is_expired(record.updated_at, now):
+            return _Record(None, {}, now, now)
+        return record
+
+    async def _modify(self, key: str,
+                      change: Callable[[_Record], Tuple[Optional[str], Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Читает запись из базы и записывает (состояние, данные) = change(запись) в одной транзакции под блокировкой,
+        поэтому одновременные изменения одного ключа (например, двойное нажатие кнопки) не теряются.
+        Возвращает записанные данные.
+        """
+        async with self._lock:
+            db = await self._get_db()
+            now = time.time()
+            # IMMEDIATE: запись блокируется сразу, чтение и изменение атомарны и для других процессов
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = await db.execute("SELECT state, data, updated_at FROM fsm WHERE key = ?", (key,))
+                row = await cursor.fetchone()
+                if row is None or self._is_expired(row[2], now):
+                    record = _Record(None, {}, now, now)
+                else:
+                    record = _Record(row[0], json.loads(row[1]), row[2], now)
+                state, data = change(record)
+                if state is None and not data:
+                    # Пустое состояние не хранится
+                    await db.execute("DELETE FROM fsm WHERE key = ?", (key,))
+                else:
+                    await db.execute(
+                        '''INSERT INTO fsm (key, state, data, updated_at) VALUES (?, ?, ?, ?)
+                           ON CONFLICT(key) DO UPDATE SET state = excluded.state, data = excluded.data,
+                                                          updated_at = excluded.updated_at''',
+                        (key, state, json.dumps(data, ensure_ascii=False), now)
+                    )
+                if self.state_ttl is not None and now - self._last_purge > self.PURGE_INTERVAL:
+                    await self._purge(db, now)
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                self._cache.pop(key, None)
+                raise
+            if state is None and not data:
+                self._cache.pop(key, None)
+            else:
+                self._cache[key] = _Record(state, data, now, now)
+            return data
+
+    async def _purge(self, db: aiosqlite.Connection, now: float):
+        """Удаляет устаревшие состояния из базы и кэша"""
+        self._last_purge = now
+        await db.execute("DELETE FROM fsm WHERE updated_at < ?", (now - self.state_ttl,))
+        for key in [key for key, record in self._cache.items() if self._is_expired(record.updated_at, now)]:
+            del self._cache[key]
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        await self._modify(self.key_builder.build(key), lambda record: (state, record.data))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._load(self.key_builder.build(key))).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        data = dict(data)
+        await self._modify(self.key_builder.build(key), lambda record: (record.state, data))
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> Dict[str, Any]:
+        new_data = await self._modify(self.key_builder.build(key),
+                                      lambda record: (record.state, {**record.data, **data}))
+        return dict(new_data)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return dict((await self._load(self.key_builder.build(key))).data)
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+        self._cache.clear()
+
+
+def create_fsm_storage(fsm_config: Dict) -> BaseStorage:
+    """
+    Создаёт хранилище FSM по блоку fsm файла настроек.
+    Хранилища: sqlite (по умолчанию), redis (нужен пакет redis) и memory (в памяти процесса, для проверок).
+    """
+    backend = fsm_config.get("backend", "sqlite")
+    state_ttl = fsm_config.get("state_ttl", 86400)
+    if backend == "sqlite":
+        return SQLiteStorage(fsm_config.get("path", "database/fsm.sqlite"), state_ttl, fsm_config.get("cache_ttl", 60))
+    if backend == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
+        return RedisStorage.from_url(fsm_config.get("redis_url", "redis://localhost:6379/0"),
+                                     state_ttl=state_ttl, data_ttl=state_ttl)
+    if backend == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown FSM storage: {backend}")
@@ -0,0 +1,50 @@
+import time
+from collections import OrderedDict
+from typing import *
+
+
+class ProfileCache:
+    """
+    Кэш профилей пользователей: не более maxsize записей (вытесняются давно не запрашивавшиеся),
+    каждая действует ttl секунд. Хранятся и отсутствующие профили (None) - незарегистрированные
+    пользователи тоже не должны обращаться к базе на каждое сообщение.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[int, Tuple[float, Any]] = OrderedDict()
+        # Увеличивается при каждом сбросе: профиль, прочитанный до сброса, в кэш уже не попадает
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Tuple[bool, Any]:
+        """Возвращает (найден ли профиль в кэше, профиль)"""
+        cached = self._data.get(user_id)
+        if cached is None or time.monotonic() - cached[0] >= self.ttl:
+            self.misses += 1
+            return False, None
+        self._data.move_to_end(user_id)
+        self.hits += 1
+        return True, cached[1]
+
+    def put(self, user_id: int, profile: Any, generation: int):
+        """Сохраняет профиль, прочитанный из базы при поколении generation"""
+        if generation != self.generation:
+            return
+        self._data[user_id] = (time.monotonic(), profile)
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, user_id: int = None):
+        """Сбрасывает профиль пользователя (или все профили, если пользователь не указан)"""
+        self.generation += 1
+        if user_id is None:
+            self._data.clear()
+        else:
+            self._data.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
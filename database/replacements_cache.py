@@ -0,0 +1,177 @@
+import json
+import aiosqlite
+from datetime import date, datetime
+from typing import *
+# Компоненты проекта
+from core.replacement_entry import ReplacementEntry, normalize_group, normalize_teacher
+
+# Файл базы данных с заменами
+replacements_db_file = None
+
+
+def _get_db_file(db_path: str = None) -> str:
+    db_file = db_path or replacements_db_file
+    if not db_file:
+        raise ValueError("Database file not specified")
+    return db_file
+
+
+async def init_replacements_db(file: str = None):
+    """Создаёт таблицу с последними полученными заменами по дням недели и архив замен по датам"""
+    global replacements_db_file
+    if file is not None and replacements_db_file is None:
+        replacements_db_file = file
+    async with aiosqlite.connect(_get_db_file(file)) as db:
+        await db.execute('''
+                    CREATE TABLE IF NOT EXISTS replacements (
+                        day TEXT primary key,
+                        changes_date TEXT,
+                        changes_day TEXT,
+                        data TEXT NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+                    )
+                ''')
+        # Архив: по строке на каждую замену, ключ группы - нормализованное название
+        await db.execute('''
+                    CREATE TABLE IF NOT EXISTS archive (
+                        changes_date TEXT NOT NULL,
+                        group_key TEXT NOT NULL,
+                        position INTEGER NOT NULL,
+                        group_name TEXT NOT NULL,
+                        entry TEXT NOT NULL,
+                        PRIMARY KEY (changes_date, group_key, position)
+                    ) WITHOUT ROWID
+                ''')
+        await db.execute("CREATE INDEX IF NOT EXISTS archive_group_date ON archive (group_key, changes_date)")
+        # Связь замен архива с преподавателями (у замены их может быть несколько)
+        await db.execute('''
+                    CREATE TABLE IF NOT EXISTS archive_teachers (
+                        teacher_key TEXT NOT NULL,
+                        changes_date TEXT NOT NULL,
+                        group_key TEXT NOT NULL,
+                        position INTEGER NOT NULL,
+                        PRIMARY KEY (teacher_key, changes_date, group_key, position)
+                    ) WITHOUT ROWID
+                ''')
+        await db.execute("CREATE INDEX IF NOT EXISTS archive_teachers_group ON archive_teachers (changes_date, group_key)")
+        await db.commit()
+
+
+async def load_replacements(db_path: str = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Возвращает сохранённые замены в формате {день недели: {"info": {...}, группа: [...], ...}},
+    пригодном для передачи в Replacements.
+    """
+    async with aiosqlite.connect(_get_db_file(db_path)) as db:
+        cursor = await db.execute("SELECT day, changes_date, changes_day, data FROM replacements")
+        rows = await cursor.fetchall()
+
+    result = {}
+    for day, changes_date, changes_day, data in rows:
+        replacements = json.loads(data)
+        replacements["info"] = {
+            "date": datetime.fromisoformat(changes_date) if changes_date else None,
+            "day": changes_day
+        }
+        result[day] = replacements
+    return result
+
+
+async def save_replacements(replacements: Dict[str, Dict[str, Any]], db_path: str = None) -> None:
+    """
+    Сохраняет замены по дням недели в одной транзакции.
+    Дни, отсутствующие в словаре, удаляются из хранилища.
+    """
+    rows = []
+    for day, day_replacements in replacements.items():
+        info = day_replacements["info"]
+        data = {group: entries for group, entries in day_replacements.items() if group != "info"}
+        rows.append((
+            day,
+            info["date"].isoformat() if info["date"] else None,
+            info["day"],
+            json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        ))
+
+    async with aiosqlite.connect(_get_db_file(db_path)) as db:
+        await db.execute(
+            f"DELETE FROM replacements WHERE day NOT IN ({', '.join('?' * len(replacements))})",
+            tuple(replacements)
+        )
+        await db.executemany(
+            '''INSERT OR REPLACE INTO replacements (day, changes_date, changes_day, data, updated_at)
+               VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)''',
+            rows
+        )
+        await db.commit()
+
+
+async def archive_replacements(days: Iterable[Tuple[date, Dict[str, List[ReplacementEntry]]]],
+                               db_path: str = None) -> None:
+    """
+    Записывает замены групп в архив в одной транзакции.
+    Замены группы на дату, уже имеющиеся в архиве, заменяются новыми (сайт мог их исправить),
+    пустой список удаляет замены группы. Группы, не указанные в словаре, не меняются.
+    """
+    rows, teacher_rows, keys = [], [], []
+    for changes_date, groups in days:
+        day = changes_date.isoformat()
+        for group, entries in groups.items():
+            group_key = normalize_group(group)
+            keys.append((day, group_key))
+            for position, entry in enumerate(entries):
+                rows.append((day, group_key, position, group,
+                             json.dumps(entry.to_raw(), ensure_ascii=False, separators=(',', ':'))))
+                # Один преподаватель может быть указан в замене дважды
+                for teacher_key in {normalize_teacher(teacher) for teacher in entry.teachers}:
+                    teacher_rows.append((teacher_key, day, group_key, position))
+
+    async with aiosqlite.connect(_get_db_file(db_path)) as db:
+        await db.executemany("DELETE FROM archive WHERE changes_date = ? AND group_key = ?", keys)
+        await db.executemany("DELETE FROM archive_teachers WHERE changes_date = ? AND group_key = ?", keys)
+        await db.executemany(
+            "INSERT INTO archive (changes_date, group_key, position, group_name, entry) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        await db.executemany(
+            "INSERT INTO archive_teachers (teacher_key, changes_date, group_key, position) VALUES (?, ?, ?, ?)",
+            teacher_rows
+        )
+        await db.commit()
+
+
+async def iter_group_archive(group: str, date_from: date, date_to: date,
+                             db_path: str = None) -> AsyncIterator[Tuple[date, str, ReplacementEntry]]:
+    """
+    Перебирает замены группы за период (включительно) в порядке дат и пар: (дата, группа, замена).
+    Строки читаются из базы по мере перебора.
+    """
+    async with aiosqlite.connect(_get_db_file(db_path)) as db:
+        cursor = await db.execute(
+            '''SELECT changes_date, group_name, entry
+               FROM archive
+               WHERE group_key = ? AND changes_date BETWEEN ? AND ?
+               ORDER BY changes_date, position''',
+            (normalize_group(group), date_from.isoformat(), date_to.isoformat())
+        )
+        async for changes_date, group_name, entry in cursor:
+            yield date.fromisoformat(changes_date), group_name, ReplacementEntry.from_raw(json.loads(entry))
+
+
+async def iter_teacher_archive(last_name: str, date_from: date, date_to: date,
+                               db_path: str = None) -> AsyncIterator[Tuple[date, str, ReplacementEntry]]:
+    """
+    Перебирает замены преподавателя за период (включительно) в порядке дат: (дата, группа, замена).
+    Строки читаются из базы по мере перебора.
+    """
+    async with aiosqlite.connect(_get_db_file(db_path)) as db:
+        cursor = await db.execute(
+            '''SELECT a.changes_date, a.group_name, a.entry
+               FROM archive_teachers t
+               JOIN archive a USING(changes_date, group_key, position)
+               WHERE t.teacher_key = ? AND t.changes_date BETWEEN ? AND ?
+               ORDER BY a.changes_date, a.position, a.group_key''',
+            (normalize_teacher(last_name), date_from.isoformat(), date_to.isoformat())
+        )
+        async for changes_date, group_name, entry in cursor:
+            yield date.fromisoformat(changes_date), group_name, ReplacementEntry.from_raw(json.loads(entry))
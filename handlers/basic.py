@@ -6,37 +6,44 @@ from core.my_utils import escape_for_telegram
 
 router = Router()
 
+# Неизменяемые ответы экранируются один раз
+START_ANSWER = escape_for_telegram("Привет!\n"
+                                   "Для работы бота требуется зарегистрироваться:\n"
+                                   "/register"
+                                   "\n"
+                                   "/help для справки")
+HELP_ANSWER = escape_for_telegram("Справка:\n"
+                                  "\n"
+                                  "/start - приветственное сообщение\n"
+                                  "\n"
+                                  "/help - справка (это сообщение)\n"
+                                  "\n"
+                                  "/register - регистрация с системе бота\n"
+                                  "/unregister - удалить все записи из базы данных\n"
+                                  "\n"
+                                  "/bells [день] - расписание звонков, "
+                                  "если не указать день - будет текущий\n"
+                                  "`0`|`рабочий` - расписание для рабочего дня\n"
+                                  "`1`|`выходной` - расписание для выходного дня\n"
+                                  "`2`|`сокращённый` - расписание для сокращённого дня\n"
+                                  "/now - текущая пара и время до звонка\n"
+                                  "\n"
+                                  "/week - получить текущую неделю, в воскресенье - следующую "
+                                  "(верхняя/нижняя)\n"
+                                  "/nextweek - получить следующую неделю (верхняя/нижняя)\n"
+                                  "/currweek - получить текущую неделю в любом случае (верхняя/нижняя)\n"
+                                  "\n"
+                                  "/today - сводка на сегодня: неделя, звонки и замены группы\n"
+                                  "/tomorrow - сводка на завтра\n"
+                                  "/changes - замены для своей группы или преподавателя")
+
 
 @router.message(Command("start"))
 async def cmd_start(message: types.Message):
     """Приветственное сообщение"""
-    await message.answer(escape_for_telegram("Привет!\n"
-                                             "Для работы бота требуется зарегистрироваться:\n"
-                                             "/register"
-                                             "\n"
-                                             "/help для справки"),
-                         parse_mode=ParseMode.MARKDOWN_V2)
+    await message.answer(START_ANSWER, parse_mode=ParseMode.MARKDOWN_V2)
 
 
 @router.message(Command("help"))
-async def cmd_start(message: types.Message):
-    await message.answer(escape_for_telegram("Справка:\n"
-                                             "\n"
-                                             "/start - приветственное сообщение\n"
-                                             "\n"
-                                             "/help - справка (это сообщение)\n"
-                                             "\n"
-                                             "/register - регистрация с системе бота\n"
-                                             "/unregister - удалить все записи из базы данных\n"
-                                             "\n"
-                                             "/bells [день] - расписание звонков, "
-                                             "если не указать день - будет текущий\n"
-                                             "`0`|`рабочий` - расписание для рабочего дня\n"
-                                             "`1`|`выходной` - расписание для выходного дня\n"
-                                             "`2`|`сокращённый` - расписание для сокращённого дня\n"
-                                             "\n"
-                                             "/week - получить текущую неделю, в воскресенье - следующую "
-                                             "(верхняя/нижняя)\n"
-                                             "/nextweek - получить следующую неделю (верхняя/нижняя)\n"
-                                             "/currweek - получить текущую неделю в любом случае (верхняя/нижняя)"),
-                         parse_mode=ParseMode.MARKDOWN_V2)
+async def cmd_help(message: types.Message):
+    await message.answer(HELP_ANSWER, parse_mode=ParseMode.MARKDOWN_V2)
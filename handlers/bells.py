@@ -1,36 +1,36 @@
 from aiogram import Router, types
 from aiogram.filters.command import Command, CommandObject
 from aiogram.enums import ParseMode
-from datetime import date
-# Настройки
-from configs.config_reader import config
+from datetime import date, datetime
 # Компоненты проекта
 from core.my_utils import escape_for_telegram
-from core.bells import BellSchedule
+from core.bells import bell_schedule as bells
+from core.academic_calendar import academic_calendar
+from core.render_cache import render_cache
 
 router = Router()
 
-bells = BellSchedule(config.bells)
+# Неизменяемые ответы экранируются один раз
+BELLS_USAGE = ("Для того чтобы получить звонки на конкретный день напиши:\n"
+               "/bells [день]\n"
+               "`0`|`рабочий` - расписание для рабочего дня\n"
+               "`1`|`выходной` - расписание для выходного дня\n"
+               "`2`|`сокращённый` - расписание для сокращённого дня")
+SUNDAY_ANSWER = escape_for_telegram("Сегодня воскресенье. \n" + BELLS_USAGE)
+HOLIDAY_ANSWER = escape_for_telegram("Сегодня пар нет. \n" + BELLS_USAGE)
+WRONG_ARGS_ANSWER = escape_for_telegram("Аргументы не верны!")
 
 
 @router.message(Command("bells"))
 async def cmd_bells(message: types.Message, command: CommandObject):
     """Вывод расписания звонков"""
     if command.args is None:
-        if date.today().weekday() == 6:
-            await message.answer(escape_for_telegram("Сегодня воскресенье. \n"
-                                                     "Для того чтобы получить звонки на конкретный день напиши:\n"
-                                                     "/bells [день]\n"
-                                                     "`0`|`рабочий` - расписание для рабочего дня\n"
-                                                     "`1`|`выходной` - расписание для выходного дня\n"
-                                                     "`2`|`сокращённый` - расписание для сокращённого дня"),
-                                 parse_mode=ParseMode.MARKDOWN_V2)
+        # Расписание выбирается по календарю: с учётом праздников и сокращённых дней
+        day = academic_calendar.get_day().bells_day
+        if day is None:
+            answer = SUNDAY_ANSWER if date.today().weekday() == 6 else HOLIDAY_ANSWER
+            await message.answer(answer, parse_mode=ParseMode.MARKDOWN_V2)
             return
-        else:
-            if date.today().weekday() == 5:
-                day = "weekend_day"
-            else:
-                day = "working_day"
     else:
         argument = command.args.strip()
         if argument == "0" or argument == "рабочий":
@@ -40,6 +40,21 @@ async def cmd_bells(message: types.Message, command: CommandObject):
         elif argument == "2" or argument == "сокращённый":
             day = "shortened_day"
         else:
-            await message.answer(escape_for_telegram("Аргументы не верны!"))
+            await message.answer(WRONG_ARGS_ANSWER)
             return
-    await message.answer(escape_for_telegram(bells.format_day_bells(day)))
+    # Расписание звонков меняется только вместе с конфигурацией, версия данных постоянна
+    await message.answer(render_cache.get("bells", day, 0,
+                                          lambda: escape_for_telegram(bells.format_day_bells(day))))
+
+
+@router.message(Command("now"))
+async def cmd_now(message: types.Message):
+    """Текущая пара или перерыв и время до звонка"""
+    now = datetime.now()
+    day = academic_calendar.get_day(now.date()).bells_day
+    if day is None:
+        await message.answer(escape_for_telegram("Сегодня пар нет"))
+        return
+    minute = now.hour * 60 + now.minute
+    await message.answer(render_cache.get("now", (day, minute), 0,
+                                          lambda: escape_for_telegram(bells.format_status(day, minute))))
@@ -1,9 +1,54 @@
 from aiogram import Router, types
 from aiogram.filters.command import Command
-from aiogram.enums import ParseMode
-# Настройки
-from configs.config_reader import config
+from typing import *
 # Компоненты проекта
 from core.my_utils import escape_for_telegram
+from core.replacements import replacements_manager, normalize_group, normalize_teacher
+from core.render_cache import render_cache
+import database.database as database
 
 router = Router()
+
+# Неизменяемые ответы экранируются один раз
+NOT_REGISTERED_ANSWER = escape_for_telegram("Для получения замен требуется зарегистрироваться:\n/register")
+NO_CHANGES_ANSWER = escape_for_telegram("Замены ещё не опубликованы")
+INCOMPLETE_ANSWER = escape_for_telegram("Регистрация не завершена, пройдите её заново:\n/register")
+
+
+def render_group_changes(group: str) -> str:
+    days = replacements_manager.get_upcoming_replacements()
+    if not days:
+        return NO_CHANGES_ANSWER
+    return escape_for_telegram("\n\n".join(replacements.format_group(group) for replacements in days))
+
+
+def render_teacher_changes(last_name: str) -> str:
+    days = replacements_manager.get_upcoming_replacements()
+    if not days:
+        return NO_CHANGES_ANSWER
+    return escape_for_telegram("\n\n".join(replacements.format_teacher(last_name) for replacements in days))
+
+
+@router.message(Command("changes"))
+async def cmd_changes(message: types.Message, profile: Optional[database.UserProfile]):
+    """Замены на опубликованные дни: для студента - по группе, для преподавателя - по фамилии"""
+    if profile is None:
+        await message.answer(NOT_REGISTERED_ANSWER)
+        return
+    if not profile.is_complete:
+        await message.answer(INCOMPLETE_ANSWER)
+        return
+
+    # Поиск по группе и фамилии идёт по индексам замен, построенным при обновлении,
+    # а готовый ответ хранится, пока не изменятся замены этой группы (преподавателя) или дни в выдаче
+    days = replacements_manager.get_upcoming_replacements()
+    group_name, last_name = profile.group_name, profile.last_name
+    if profile.role == "teacher":
+        version = tuple((replacements.date, replacements.teacher_hash(last_name)) for replacements in days)
+        answer = render_cache.get("changes_teacher", normalize_teacher(last_name), version,
+                                  lambda: render_teacher_changes(last_name))
+    else:
+        version = tuple((replacements.date, replacements.group_hash(group_name)) for replacements in days)
+        answer = render_cache.get("changes_group", normalize_group(group_name), version,
+                                  lambda: render_group_changes(group_name))
+    await message.answer(answer)
@@ -0,0 +1,41 @@
+from aiogram import Router, types
+from aiogram.filters.command import Command
+from datetime import date, timedelta
+from typing import *
+# Компоненты проекта
+from core.my_utils import escape_for_telegram
+from core.digest import get_digest
+import database.database as database
+
+router = Router()
+
+# Неизменяемые ответы экранируются один раз
+NOT_REGISTERED_ANSWER = escape_for_telegram("Для получения сводки требуется зарегистрироваться:\n/register")
+NOT_STUDENT_ANSWER = escape_for_telegram("Сводка на день доступна только студентам")
+INCOMPLETE_ANSWER = escape_for_telegram("Регистрация не завершена, пройдите её заново:\n/register")
+
+
+async def answer_digest(message: types.Message, profile: Optional[database.UserProfile], label: str,
+                        target_date: date):
+    if profile is None:
+        await message.answer(NOT_REGISTERED_ANSWER)
+        return
+    if profile.role != "student":
+        await message.answer(NOT_STUDENT_ANSWER)
+        return
+    if not profile.is_complete:
+        await message.answer(INCOMPLETE_ANSWER)
+        return
+    await message.answer(get_digest(label, target_date, profile.group_name, profile.subgroup))
+
+
+@router.message(Command("today"))
+async def cmd_today(message: types.Message, profile: Optional[database.UserProfile]):
+    """Сводка на сегодня: неделя, звонки и замены группы"""
+    await answer_digest(message, profile, "today", date.today())
+
+
+@router.message(Command("tomorrow"))
+async def cmd_tomorrow(message: types.Message, profile: Optional[database.UserProfile]):
+    """Сводка на завтра: неделя, звонки и замены группы"""
+    await answer_digest(message, profile, "tomorrow", date.today() + timedelta(days=1))
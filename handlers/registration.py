@@ -1,3 +1,4 @@
+from typing import *
 from aiogram import Router, types
 from aiogram.enums import ParseMode
 from aiogram.filters import StateFilter
@@ -10,6 +11,22 @@ import database.database as database
 
 router = Router()
 
+# Клавиатура выбора группы: (версия списка групп, разметка)
+_groups_markup: Optional[Tuple[int, types.InlineKeyboardMarkup]] = None
+
+
+async def get_groups_markup() -> types.InlineKeyboardMarkup:
+    """Возвращает клавиатуру со списком групп, перестраивая её только при изменении списка"""
+    global _groups_markup
+    rows = await database.get_groups(database.users_db_file)
+    if _groups_markup is None or _groups_markup[0] != database.groups_version:
+        kb = InlineKeyboardBuilder()
+        for gid, faculty, name in rows:
+            kb.button(text=f"{name}", callback_data=f"grp_id:{gid}|grp_name:{name}")
+        kb.adjust(4)
+        _groups_markup = (database.groups_version, kb.as_markup())
+    return _groups_markup[1]
+
 
 # ================================
 # Описание состояний FSM
@@ -26,15 +43,15 @@ class RegStates(StatesGroup):
 # Старт регистрации
 # ================================
 @router.message(Command("register"))
-async def cmd_register(message: types.Message, state: FSMContext):
+async def cmd_register(message: types.Message, state: FSMContext, profile: Optional[database.UserProfile]):
     """
     Начало процесса регистрации.
     Очищаем предыдущий контекст и просим выбрать роль.
     """
     await state.clear()
 
-    # Проверка наличия пользователя
-    if await database.user_exists(message.from_user.id, database.users_db_file):
+    # Проверка наличия пользователя; прерванную регистрацию (без данных роли) можно пройти заново
+    if profile is not None and profile.is_complete:
         await message.answer(escape_for_telegram("❌ Вы уже зарегистрированы!"))
         return
 
@@ -83,15 +100,10 @@ async def process_role(cb: types.CallbackQuery, state: FSMContext):
         await cb.message.edit_text(text, parse_mode=ParseMode.MARKDOWN)
 
         # Вывод списка групп
-        rows = await database.get_groups(database.users_db_file)
-        kb = InlineKeyboardBuilder()
-        for gid, faculty, name in rows:
-            kb.button(text=f"{name}", callback_data=f"grp_id:{gid}|grp_name:{name}")
-        kb.adjust(4)
         await cb.message.answer(
             "Выберите группу из списка:",
             parse_mode=ParseMode.MARKDOWN,
-            reply_markup=kb.as_markup()
+            reply_markup=await get_groups_markup()
         )
         await state.set_state(RegStates.group_select)
 
@@ -229,13 +241,11 @@ async def skip_lname(cb: types.CallbackQuery, state: FSMContext):
     data = await state.get_data()
     role = data.get("role")
 
-    # Создаём запись в users
-    await database.create_user(cb.from_user.id, role, database.users_db_file)
-
     if role == "student":
         # Сохраняем студента
-        await database.save_student(
+        await database.register_user(
             user_id=cb.from_user.id,
+            role=role,
             group_id=data.get("group_id"),
             subgroup=data.get("subgroup"),
             first_name=data.get("first_name"),
@@ -254,8 +264,8 @@ async def skip_lname(cb: types.CallbackQuery, state: FSMContext):
 @router.message(RegStates.last_name)
 async def input_last(message: types.Message, state: FSMContext):
     """
-    Сохраняем пользователя в users,
-    а затем в students или teachers через database
+    Сохраняем пользователя в users
+    и в students или teachers через database
     """
     data = await state.get_data()
     role = data.get("role")
@@ -264,27 +274,16 @@ async def input_last(message: types.Message, state: FSMContext):
         f"Фамилия: *{message.text.strip()}*", parse_mode=ParseMode.MARKDOWN
     )
 
-    # Создаём запись в users
-    await database.create_user(message.from_user.id, role, database.users_db_file)
-
-    if role == "student":
-        # Сохраняем студента
-        await database.save_student(
-            user_id=message.from_user.id,
-            group_id=data.get("group_id"),
-            subgroup=data.get("subgroup"),
-            first_name=data.get("first_name"),
-            last_name=last,
-            db_path=database.users_db_file
-        )
-    else:
-        # Сохраняем преподавателя
-        await database.save_teacher(
-            user_id=message.from_user.id,
-            first_name=data.get("first_name"),
-            last_name=last,
-            db_path=database.users_db_file
-        )
+    # Создаём запись в users и students/teachers одной транзакцией
+    await database.register_user(
+        user_id=message.from_user.id,
+        role=role,
+        group_id=data.get("group_id"),
+        subgroup=data.get("subgroup"),
+        first_name=data.get("first_name"),
+        last_name=last,
+        db_path=database.users_db_file
+    )
 
     await message.answer(escape_for_telegram("✅ Регистрация завершена!"))
 
@@ -296,11 +295,11 @@ async def input_last(message: types.Message, state: FSMContext):
 # Удаление пользователя
 # ================================
 @router.message(Command("unregister"))
-async def cmd_unregister(message: types.Message):
+async def cmd_unregister(message: types.Message, profile: Optional[database.UserProfile]):
     """Удаление пользователя из системы"""
     user_id = message.from_user.id
 
-    if not await database.user_exists(user_id, database.users_db_file):
+    if profile is None:
         await message.answer(escape_for_telegram("❌ Вы не зарегистрированы!"))
         return
 
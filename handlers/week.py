@@ -3,33 +3,42 @@ from aiogram.filters.command import Command
 from datetime import date
 # Компоненты программы
 from core.my_utils import escape_for_telegram
-from core.week import Week
+from core.academic_calendar import academic_calendar
+from core.render_cache import render_cache
 
 router = Router()
 
 
-@router.message(Command("week"))
-async def cmd_week(message: types.Message):
-    week = Week()
+def render_week() -> str:
     if date.today().weekday() == 6:
-        next_week = week.next_week()
         answer = "Сегодня воскресенье\n"
-        answer += "Следующая неделя *" + next_week.week_type().upper() + "*"
+        answer += "Следующая неделя *" + academic_calendar.get_next_week().week_type.upper() + "*"
     else:
-        answer = "Сейчас *" + week.week_type().upper() + "* неделя"
-    await message.answer(escape_for_telegram(answer))
+        answer = "Сейчас *" + academic_calendar.get_day().week_type.upper() + "* неделя"
+    return escape_for_telegram(answer)
+
+
+def render_currweek() -> str:
+    answer = "Сейчас *" + academic_calendar.get_day().week_type.upper() + "* неделя"
+    return escape_for_telegram(answer)
+
+
+def render_nextweek() -> str:
+    answer = "Следующая неделя *" + academic_calendar.get_next_week().week_type.upper() + "*"
+    return escape_for_telegram(answer)
+
+
+# Ответы зависят только от текущей даты - она и служит версией данных
+@router.message(Command("week"))
+async def cmd_week(message: types.Message):
+    await message.answer(render_cache.get("week", "week", date.today(), render_week))
 
 
 @router.message(Command("currweek"))
 async def cmd_currweek(message: types.Message):
-    week = Week()
-    answer = "Сейчас *" + week.week_type().upper() + "* неделя"
-    await message.answer(escape_for_telegram(answer))
+    await message.answer(render_cache.get("week", "currweek", date.today(), render_currweek))
 
 
 @router.message(Command("nextweek"))
 async def cmd_nextweek(message: types.Message):
-    week = Week()
-    next_week = week.next_week()
-    answer = "Следующая неделя *" + next_week.week_type().upper() + "*"
-    await message.answer(escape_for_telegram(answer))
+    await message.answer(render_cache.get("week", "nextweek", date.today(), render_nextweek))
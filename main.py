@@ -3,14 +3,25 @@ import asyncio
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
 # Компоненты проекта
 from configs.config_reader import config
 from core.replacements import replacements_manager
+from core.notifications import Notifier
+from core.webhook import run_webhook
+from core.render_cache import render_cache
+from core.metrics import metrics, start_metrics_server, log_metrics_periodically
 import database.database as database
+import database.replacements_cache as replacements_cache
+from database.fsm_storage import create_fsm_storage
+# Промежуточные обработчики
+from middlewares.profile import ProfileMiddleware
+from middlewares.metrics import MetricsMiddleware
 # Обработчики
 from handlers.basic import router as basic_router
 from handlers.bells import router as bells_router
 from handlers.week import router as week_router
+from handlers.digest import router as digest_router
 from handlers.registration import router as register_router
 from handlers.changes import router as changes_router
 
@@ -25,20 +36,70 @@ bot = Bot(token=config.bot_token.get_secret_value(),
               parse_mode=ParseMode.MARKDOWN_V2
           ))
 
-# Объект диспетчера aiogram
-dp = Dispatcher()
-# Подключение роутеров обработчиков
-dp.include_router(basic_router)
-dp.include_router(bells_router)
-dp.include_router(week_router)
-dp.include_router(register_router)
-dp.include_router(changes_router)
+# Рассылка уведомлений о заменах
+notifier = Notifier(bot,
+                    rate=config.notifications.get("rate", 25),
+                    chat_interval=config.notifications.get("chat_interval", 1),
+                    workers=config.notifications.get("workers", 4))
+replacements_manager.add_listener(notifier.notify_changes)
+
+# Метрики состояния, вычисляемые при чтении
+metrics.gauge("notify_queue_size", "Notifications waiting to be sent", func=notifier.queue.qsize)
+metrics.gauge("cache_hits_total", "Cache hits", ("cache",), metric_type="counter",
+              func=lambda: {("render",): render_cache.hits, ("profile",): database.profile_cache.hits})
+metrics.gauge("cache_misses_total", "Cache misses", ("cache",), metric_type="counter",
+              func=lambda: {("render",): render_cache.misses, ("profile",): database.profile_cache.misses})
+metrics.gauge("cache_entries", "Entries stored in caches", ("cache",),
+              func=lambda: {("render",): len(render_cache), ("profile",): len(database.profile_cache)})
+
+
+def create_dispatcher(storage: BaseStorage) -> Dispatcher:
+    """
+    Создаёт диспетчер aiogram с промежуточными обработчиками и роутерами бота.
+    Роутер подключается только к одному диспетчеру, поэтому вызывается один раз на процесс.
+    """
+    dp = Dispatcher(storage=storage)
+    # Профиль пользователя передаётся обработчикам в аргументе profile
+    dp.update.outer_middleware(ProfileMiddleware())
+    # Длительность обработчиков сообщений и нажатий кнопок
+    dp.message.middleware(MetricsMiddleware())
+    dp.callback_query.middleware(MetricsMiddleware())
+    # Подключение роутеров обработчиков
+    dp.include_router(basic_router)
+    dp.include_router(bells_router)
+    dp.include_router(week_router)
+    dp.include_router(digest_router)
+    dp.include_router(register_router)
+    dp.include_router(changes_router)
+    return dp
 
 
 async def main():
+    # Состояния FSM (регистрация) хранятся вне процесса
+    dp = create_dispatcher(create_fsm_storage(config.fsm))
     await database.init_users_db("database/users.sqlite")
-    asyncio.create_task(replacements_manager.start_periodic_updates(30))
-    await dp.start_polling(bot)
+    await replacements_cache.init_replacements_db("database/replacements.sqlite")
+    await replacements_manager.load_cache()
+    await notifier.start()
+    asyncio.create_task(replacements_manager.start_periodic_updates(config.changes.get("update_period", 30)))
+    metrics_runner = None
+    if config.metrics.get("port"):
+        metrics_runner = await start_metrics_server(config.metrics.get("host", "127.0.0.1"), config.metrics["port"])
+    if config.metrics.get("log_interval"):
+        asyncio.create_task(log_metrics_periodically(config.metrics["log_interval"]))
+    try:
+        if config.bot.get("mode", "polling") == "webhook":
+            await run_webhook(dp, bot, config.bot)
+        else:
+            # Получение обновлений невозможно, пока установлен вебхук
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await notifier.stop()
+        await replacements_manager.parser.close()
+        await database.close_users_db()
 
 
 if __name__ == "__main__":
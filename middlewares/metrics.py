@@ -0,0 +1,32 @@
+import time
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+from typing import *
+# Компоненты проекта
+from core.metrics import metrics
+
+HANDLER_SECONDS = metrics.histogram("handler_seconds", "Duration of update handlers", ("handler",))
+HANDLER_ERRORS = metrics.counter("handler_errors_total", "Exceptions raised by update handlers", ("handler",))
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Измеряет длительность обработчиков (метка handler - имя функции обработчика).
+    Подключается как внутренний промежуточный обработчик, чтобы обработчик был уже выбран фильтрами.
+    """
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        handler_object: Optional[HandlerObject] = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object is not None else "unknown"
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(handler=name)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - start, handler=name)
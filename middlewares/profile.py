@@ -0,0 +1,22 @@
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+from typing import *
+# Компоненты проекта
+import database.database as database
+
+
+class ProfileMiddleware(BaseMiddleware):
+    """
+    Загружает профиль пользователя (database.UserProfile или None для незарегистрированного)
+    и передаёт его обработчикам в аргументе profile.
+    Профили берутся из кэша базы данных, поэтому большинство обновлений не обращается к SQLite.
+    """
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        user: Optional[User] = data.get("event_from_user")
+        if user is not None:
+            data["profile"] = await database.get_user_profile(user.id, database.users_db_file)
+        return await handler(event, data)
@@ -0,0 +1,91 @@
+"""
+Эталонные (golden) тесты разборщиков HTML: каждая сохранённая страница сайта из tests/fixtures/replacements
+разбирается каждым установленным разборщиком и build_replacements (как в ReplacementSchedule._parse_replacements),
+и итоговый словарь замен сравнивается с эталоном <страница>.json. Настройки бота не нужны.
+
+Запуск из корня репозитория:
+    python -m pytest -q tests
+Пересоздание эталонов после намеренного изменения разбора:
+    python -m tests.test_html_backends
+"""
+import os
+import json
+import pytest
+from typing import *
+# Компоненты проекта
+from core.html_backends import BACKENDS, HtmlBackend, get_backend, build_replacements
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "replacements")
+# Страницы замен на день; index.html - страница со ссылками
+PAGES = ["monday", "thursday", "no_date", "no_content"]
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+
+def to_golden(parsed: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Результат build_replacements в виде JSON: записи в формате хранилища, дата в ISO"""
+    if parsed is None:
+        return None
+    info = parsed["info"]
+    golden = {"info": {"date": info["date"].date().isoformat() if info["date"] else None, "day": info["day"]}}
+    for group, entries in parsed.items():
+        if group != "info":
+            golden[group] = [entry.to_raw() for entry in entries]
+    return golden
+
+
+def parse_page(backend: str, page: str) -> Optional[Dict[str, Any]]:
+    content = get_backend(backend).parse_content(page)
+    return to_golden(build_replacements(content) if content is not None else None)
+
+
+def backend_param(name: str):
+    """Параметр теста, пропускаемый без установленной библиотеки разборщика"""
+    try:
+        BACKENDS[name]()
+    except ImportError:
+        return pytest.param(name, marks=pytest.mark.skip(reason=f"{name} is not installed"))
+    return name
+
+
+ALL_BACKENDS = [backend_param(name) for name in BACKENDS]
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+@pytest.mark.parametrize("page", PAGES)
+def test_parse_replacements_matches_golden(backend: str, page: str):
+    expected = json.loads(read_fixture(f"{page}.json"))
+    assert parse_page(backend, read_fixture(f"{page}.html")) == expected
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+def test_parse_links_matches_golden(backend: str):
+    expected = [tuple(link) for link in json.loads(read_fixture("index.json"))]
+    assert get_backend(backend).parse_links(read_fixture("index.html")) == expected
+
+
+def test_partial_backend_fails_on_creation():
+    class LinksOnlyBackend(HtmlBackend):
+        def parse_links(self, content: str) -> List[Tuple[str, str]]:
+            return []
+
+    with pytest.raises(TypeError):
+        LinksOnlyBackend()
+
+
+def write_goldens(backend: str = "html.parser"):
+    """Сохраняет результаты разбора страниц как эталоны"""
+    for page in PAGES:
+        with open(os.path.join(FIXTURES, f"{page}.json"), "w", encoding="utf-8") as file:
+            json.dump(parse_page(backend, read_fixture(f"{page}.html")), file, ensure_ascii=False, indent=2)
+            file.write("\n")
+    with open(os.path.join(FIXTURES, "index.json"), "w", encoding="utf-8") as file:
+        json.dump(get_backend(backend).parse_links(read_fixture("index.html")), file, ensure_ascii=False, indent=2)
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    write_goldens()